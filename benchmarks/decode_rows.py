@@ -0,0 +1,67 @@
+"""
+Rows per second of parsing query results with BlockParser (the former parse_item)
+and with the schema-compiled RowDecoder.
+
+    python benchmarks/decode_rows.py
+"""
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from notiondb.block_parser import BlockParser
+from notiondb.decoder import RowDecoder
+
+
+def make_page(i):
+    return {
+        'object': 'page',
+        'id': f'page-{i}',
+        'archived': False,
+        'properties': {
+            'Name': {'id': 'title', 'type': 'title', 'title': [{'plain_text': f'Row {i}'}]},
+            'Description': {'id': 'a', 'type': 'rich_text', 'rich_text': [{'plain_text': 'A dark green '}, {'plain_text': 'leafy vegetable'}]},
+            'In stock': {'id': 'b', 'type': 'checkbox', 'checkbox': i % 2 == 0},
+            'Price': {'id': 'c', 'type': 'number', 'number': i * 0.5},
+            'Food group': {'id': 'd', 'type': 'select', 'select': {'name': 'Vegetable', 'color': 'green'}},
+            'Tags': {'id': 'e', 'type': 'multi_select', 'multi_select': [{'name': 'a', 'color': 'red'}, {'name': 'b', 'color': 'blue'}]},
+            'Last ordered': {'id': 'f', 'type': 'date', 'date': {'start': '2021-11-11', 'end': None}},
+            'Link': {'id': 'g', 'type': 'url', 'url': 'https://example.com'},
+            'Related': {'id': 'h', 'type': 'relation', 'relation': [{'id': 'r1'}, {'id': 'r2'}]},
+            'Created': {'id': 'i', 'type': 'created_time', 'created_time': f'2021-11-{1 + i % 28:02d}T10:22:00.000Z'},
+            'Edited': {'id': 'j', 'type': 'last_edited_time', 'last_edited_time': '2021-11-11T10:22:00.000Z'},
+            'Formula': {'id': 'k', 'type': 'formula', 'formula': {'type': 'number', 'number': 1}},
+        },
+    }
+
+
+def parse_with_block_parser(item):
+    result = {
+        '_id': item.get('id'),
+    }
+    if item.get('archived'):
+        result.update({
+            '_archived': True,
+        })
+    properties = item.get('properties', {})
+    for prop in properties.keys():
+        result[prop] = BlockParser(properties[prop]).value
+    return result
+
+
+def bench(name, decode, pages):
+    start = time.perf_counter()
+    decode(pages)
+    elapsed = time.perf_counter() - start
+    print(f'{name:<12} {len(pages) / elapsed:>12,.0f} rows/s')
+
+
+if __name__ == '__main__':
+    count = 50000
+    pages = [make_page(i) for i in range(count)]
+    schema = {name: {'id': prop['id'], 'type': prop['type']} for name, prop in pages[0]['properties'].items()}
+
+    bench('BlockParser', lambda rows: [parse_with_block_parser(row) for row in rows], copy.deepcopy(pages))
+    bench('RowDecoder', RowDecoder(schema).decode_rows, copy.deepcopy(pages))
@@ -1,7 +1,18 @@
 
 from .api import NotionApi
+from .async_api import AsyncNotionApi
 from .database import NotionDatabase
 from .model import NotionModel
+from .exceptions import NotionApiError, NotionNotFoundError, NotionTransientError, NotionRateLimitedError, NotionConnectionError
+from .retry import RetryPolicy
+from .concurrency import BulkResult
+from .identity_map import IdentityMap
+from .cache import ResponseCache
+from .query_cache import QueryCache
+from .mirror import SQLiteMirror
+from .local_query import LocalQuery
+from .write_behind import WriteBehindQueue
+from .session import Session
 from .consts import *
 from .fields import *
 from .block import *
@@ -1,5 +1,16 @@
 from typing import List, Literal
+from requests.adapters import HTTPAdapter
+from .cache import ResponseCache
+from .concurrency import SingleFlight
+from .exceptions import NotionApiError, NotionConnectionError, NotionTransientError
+from .rate_limiter import RateLimiter
+from .retry import RetryPolicy
+from urllib.parse import unquote
+from urllib3.exceptions import NewConnectionError
+import inspect
 import requests
+import threading
+import time
 
 
 class ResponseDecorators:
@@ -8,40 +19,115 @@ class ResponseDecorators:
         pass
 
     @staticmethod
-    def get_result(response: requests.Response):
+    def get_result(response: requests.Response, raise_errors: bool = False):
         if response.status_code != 200:
+            # Transient failures left after retrying must not look like "not found"
+            if raise_errors or response.status_code == 429 or response.status_code in NotionTransientError.STATUSES:
+                raise NotionApiError.from_response(response)
             return None
         result: dict = response.json()
         return result
 
+    @staticmethod
+    def get_page(result: dict):
+        if not result:
+            return None, None
+        return result.get('results', []), result.get('next_cursor', None)
+
     @staticmethod
     def object(func):
-        def wrapper(*args, **kwargs):
-            return ResponseDecorators.get_result(func(*args, **kwargs))
+        def wrapper(api, *args, raise_errors: bool = None, **kwargs):
+            raise_errors = api.raise_errors if raise_errors is None else raise_errors
+            response = func(api, *args, **kwargs)
+            # AsyncNotionApi endpoints return a coroutine resolving to the response
+            if inspect.isawaitable(response):
+                return ResponseDecorators._async_result(response, raise_errors)
+            return ResponseDecorators.get_result(response, raise_errors)
         
         return wrapper
 
     @staticmethod
     def pagination(func):
-        def wrapper(*args, **kwargs):
-            result = ResponseDecorators.get_result(func(*args, **kwargs))
-            if not result:
-                return None, None
-            return result.get('results', []), result.get('next_cursor', None)
+        def wrapper(api, *args, raise_errors: bool = None, **kwargs):
+            raise_errors = api.raise_errors if raise_errors is None else raise_errors
+            response = func(api, *args, **kwargs)
+            if inspect.isawaitable(response):
+                return ResponseDecorators._async_result(response, raise_errors, paginated=True)
+            result = ResponseDecorators.get_result(response, raise_errors)
+            return ResponseDecorators.get_page(result)
         
         return wrapper
 
+    @staticmethod
+    async def _async_result(response, raise_errors: bool, paginated: bool = False):
+        result = ResponseDecorators.get_result(await response, raise_errors)
+        if paginated:
+            return ResponseDecorators.get_page(result)
+        return result
+
 class NotionApi:
 
     URL_PREFIX = 'https://api.notion.com/v1/'
 
     NOTION_VERSION = '2021-08-16'
 
-    def __init__(self, token: str, notion_version: str = None):
+    DEFAULT_POOL_SIZE = 10
+
+    DEFAULT_TIMEOUT = 30
+
+    # Notion allows an average of 3 requests per second per integration
+    DEFAULT_RATE_LIMIT = 3
+
+    RATE_LIMITED_RETRIES = 10
+
+    _shared_clients = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, token: str, notion_version: str = None, pool_size: int = None, timeout: float = None, rate_limit: float = DEFAULT_RATE_LIMIT, burst: int = None, retry: RetryPolicy = None, raise_errors: bool = False, coalesce: bool = True, cache: ResponseCache = None):
         self.token = token
         if notion_version:
             self.NOTION_VERSION = notion_version
 
+        self.pool_size = pool_size or self.DEFAULT_POOL_SIZE
+        self.timeout = timeout or self.DEFAULT_TIMEOUT
+
+        self.session = self._create_session()
+
+        # rate_limit=None disables client-side throttling
+        self.rate_limiter = RateLimiter(rate_limit, burst=burst) if rate_limit else None
+
+        self.retry = retry or RetryPolicy()
+        # Raise NotionApiError for every failed request instead of returning None for 4xx responses
+        self.raise_errors = raise_errors
+
+        # Identical GETs in flight at the same time share one request
+        self.coalesce = coalesce
+        self._flights = SingleFlight()
+
+        # Optional ResponseCache of GET responses, invalidated by the writes made through this client
+        self.cache = cache
+
+    def _create_session(self):
+        # Keep-alive connection pool, shared by every thread using this client
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update(self.headers)
+        return session
+
+    @classmethod
+    def shared(cls, token: str, **kwargs):
+        """
+        Return the client (and its connection pool) shared by every caller using the same token
+        """
+        with cls._shared_lock:
+            api = cls._shared_clients.get((cls, token))
+            if api is None:
+                api = cls(token, **kwargs)
+                cls._shared_clients[(cls, token)] = api
+            return api
+
     @property
     def headers(self):
         return {
@@ -49,6 +135,134 @@ class NotionApi:
             'Notion-Version': self.NOTION_VERSION,
         }
 
+    def _send(self, method: str, url: str, timeout: float = None, **kwargs):
+        response = None
+        for _ in range(self.RATE_LIMITED_RETRIES + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            response = self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            if response.status_code != 429:
+                break
+            # Hold back every thread using this client, then queue the request again
+            if self.rate_limiter:
+                self.rate_limiter.pause(self.retry_after(response))
+            else:
+                time.sleep(self.retry_after(response))
+        return response
+
+    @staticmethod
+    def _request_key(method: str, url: str, params: dict = None):
+        params = tuple(sorted((key, tuple(value) if isinstance(value, list) else value) for key, value in (params or {}).items()))
+        return method, url, params
+
+    def _request(self, method: str, url: str, timeout: float = None, idempotent: bool = None, **kwargs):
+        fetch = lambda: self._retrying_request(method, url, timeout=timeout, idempotent=idempotent, **kwargs)
+        if method != 'GET':
+            response = fetch()
+            # Queries and searches are POSTs marked idempotent: they write nothing
+            if not idempotent:
+                self._invalidate_cache(url, response)
+            return response
+
+        key = self._request_key(method, url, kwargs.get('params'))
+        if self.cache is None:
+            return self._flights.do(key, fetch) if self.coalesce else fetch()
+
+        response = self.cache.get(key)
+        if response is not None:
+            return response
+        path = self._cache_path(url)
+        generation = self.cache.begin_read(path)
+        try:
+            response = self._flights.do(key, fetch) if self.coalesce else fetch()
+            if response.status_code == 200:
+                self.cache.set(key, path, response, generation)
+        finally:
+            self.cache.end_read(path)
+        return response
+
+    def _cache_path(self, url: str):
+        return url[len(self.URL_PREFIX):] if url.startswith(self.URL_PREFIX) else url
+
+    def _invalidate_cache(self, url: str, response):
+        if self.cache is None:
+            return
+        result = None
+        if response is not None and response.status_code == 200:
+            try:
+                result = response.json()
+            except ValueError:
+                pass
+        # Failed writes may still have been applied, so the written object is always dropped
+        self.cache.invalidate_write(self._cache_path(url), result)
+
+    def _retrying_request(self, method: str, url: str, timeout: float = None, idempotent: bool = None, **kwargs):
+        idempotent = self.retry.is_idempotent(method, idempotent)
+        attempt = 0
+        while True:
+            try:
+                response = self._send(method, url, timeout=timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if not self.retry.should_retry_error(attempt, idempotent, sent=not self.never_sent(e)):
+                    raise NotionConnectionError(str(e)) from e
+            else:
+                if not self.retry.should_retry_status(attempt, response.status_code, idempotent):
+                    return response
+            time.sleep(self.retry.delay(attempt))
+            attempt += 1
+
+    @staticmethod
+    def never_sent(error: Exception):
+        """
+        Whether a connection error happened before the request left the client: connect timeouts,
+        refused connections and DNS failures (NameResolutionError is a NewConnectionError)
+        """
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        # requests wraps urllib3's MaxRetryError, whose reason is the underlying error
+        reason = error.args[0] if error.args else None
+        reason = getattr(reason, 'reason', reason)
+        return isinstance(reason, NewConnectionError)
+
+    @staticmethod
+    def retry_after(response: requests.Response, default: float = 1.0):
+        try:
+            return max(0.0, float(response.headers.get('Retry-After', default)))
+        except (TypeError, ValueError):
+            return default
+
+    @staticmethod
+    def filter_properties_params(filter_properties: List[str] = None):
+        """
+        Query params limiting the page properties returned to the given property ids.
+        Schema ids come URL-encoded (e.g. '%3AUPp') and are decoded here so they aren't encoded twice.
+        """
+        if not filter_properties:
+            return {}
+        return {'filter_properties': [unquote(id) for id in filter_properties]}
+
+    @property
+    def rate_limit_stats(self):
+        return self.rate_limiter.stats if self.rate_limiter else None
+
+    @property
+    def cache_stats(self):
+        return self.cache.stats if self.cache is not None else None
+
+    def close(self):
+        self.session.close()
+
+    def paginate(self, method, *args, **kwargs):
+        """
+        Iterate over every result of a paginated endpoint, e.g. api.paginate(api.query_database, id, filter=filter)
+        """
+        start_cursor = kwargs.pop('start_cursor', None)
+        while True:
+            results, start_cursor = method(*args, start_cursor=start_cursor, **kwargs)
+            yield from results or []
+            if not start_cursor:
+                break
+
     @ResponseDecorators.pagination
     def search(self, object: Literal['database', 'page'], query: str = None, start_cursor: str = None, page_size: int = None):
         url = f'{self.URL_PREFIX}search'
@@ -65,7 +279,7 @@ class NotionApi:
         if page_size:
             data['page_size'] = page_size
         
-        return requests.post(url, headers=self.headers, json=data)
+        return self._request('POST', url, json=data, idempotent=True)
 
     """
     DATABASES
@@ -92,12 +306,12 @@ class NotionApi:
                 }
             ]
         }
-        return requests.post(url, headers=self.headers, json=data)
+        return self._request('POST', url, json=data)
 
     @ResponseDecorators.object
     def get_database(self, id: str):
         url = f'{self.URL_PREFIX}databases/{id}'
-        return requests.get(url, headers=self.headers)
+        return self._request('GET', url)
 
     @ResponseDecorators.object
     def update_database(self, id: str, title: str = None, properties: dict = None):
@@ -118,14 +332,15 @@ class NotionApi:
                 'properties': properties
             })
         
-        return requests.patch(url, headers=self.headers, json=data)
+        return self._request('PATCH', url, json=data)
 
     """
     https://developers.notion.com/reference/post-database-query#post-database-query-filter
     """
     @ResponseDecorators.pagination
-    def query_database(self, id, filter: dict = None, sorts: List[dict] = None, start_cursor: str = None, page_size: int = None):
+    def query_database(self, id, filter: dict = None, sorts: List[dict] = None, start_cursor: str = None, page_size: int = None, filter_properties: List[str] = None):
         url = f'{self.URL_PREFIX}databases/{id}/query'
+        params = self.filter_properties_params(filter_properties)
         data = {}
         if filter:
             data['filter'] = filter
@@ -136,7 +351,7 @@ class NotionApi:
         if page_size:
             data['page_size'] = page_size
 
-        return requests.post(url, headers=self.headers, json=data)
+        return self._request('POST', url, params=params, json=data, idempotent=True)
 
     """
     PAGES
@@ -145,9 +360,38 @@ class NotionApi:
         return self.search('page', query=query, start_cursor=start_cursor, page_size=page_size)
 
     @ResponseDecorators.object
-    def get_page(self, id: str):
+    def get_page(self, id: str, filter_properties: List[str] = None):
         url = f'{self.URL_PREFIX}pages/{id}'
-        return requests.get(url, headers=self.headers)
+        return self._request('GET', url, params=self.filter_properties_params(filter_properties))
+
+    """
+    https://developers.notion.com/reference/retrieve-a-page-property
+    """
+    @ResponseDecorators.object
+    def get_page_property(self, id: str, property_id: str, start_cursor: str = None, page_size: int = None):
+        url = f'{self.URL_PREFIX}pages/{id}/properties/{property_id}'
+        params = {}
+        if start_cursor:
+            params['start_cursor'] = start_cursor
+        if page_size:
+            params['page_size'] = page_size
+
+        return self._request('GET', url, params=params)
+
+    def get_page_property_items(self, id: str, property_id: str):
+        """
+        Every item of a paginated property (title, rich_text, relation, people, rollup), following next_cursor
+        """
+        items = []
+        start_cursor = None
+        while True:
+            result = self.get_page_property(id, property_id, start_cursor=start_cursor, raise_errors=True)
+            if result.get('object') != 'list':
+                return [result]
+            items += result.get('results', [])
+            start_cursor = result.get('next_cursor')
+            if not start_cursor:
+                return items
 
     """
     https://developers.notion.com/reference/page#page-property-value
@@ -164,7 +408,7 @@ class NotionApi:
             data.update({
                 'archived': archived
             })
-        return requests.patch(url, headers=self.headers, json=data)
+        return self._request('PATCH', url, json=data)
 
     @ResponseDecorators.object
     def create_page(self, parent_type: Literal['database_id', 'page_id'], parent_id: str, title: str = None, properties: dict = {}, children: List[dict] = None, icon: str = None, cover: str = None):
@@ -208,12 +452,12 @@ class NotionApi:
                     }
                 },
             })
-        return requests.post(url, headers=self.headers, json=data)
+        return self._request('POST', url, json=data)
 
     @ResponseDecorators.object
     def get_block(self, id: str):
         url = f'{self.URL_PREFIX}blocks/{id}'
-        return requests.get(url, headers=self.headers)
+        return self._request('GET', url)
 
     @ResponseDecorators.object
     def update_block(self, id: str, type_object: dict = None, archived: bool = None):
@@ -226,12 +470,12 @@ class NotionApi:
                 'archived': archived
             })
 
-        return requests.patch(url, headers=self.headers, json=data)
+        return self._request('PATCH', url, json=data)
 
     @ResponseDecorators.object
     def delete_block(self, id: str):
         url = f'{self.URL_PREFIX}blocks/{id}'
-        return requests.delete(url, headers=self.headers)
+        return self._request('DELETE', url)
 
     @ResponseDecorators.pagination
     def get_block_children(self, id: str, start_cursor: str = None, page_size: int = None):
@@ -242,7 +486,7 @@ class NotionApi:
         if page_size:
             params['page_size'] = page_size
 
-        return requests.get(url, headers=self.headers, params=params)
+        return self._request('GET', url, params=params)
 
     @ResponseDecorators.object
     def append_block_children(self, id: str, children: List[dict]):
@@ -250,4 +494,5 @@ class NotionApi:
         data = {
             'children': children
         }
-        return requests.patch(url, headers=self.headers, json=data)
+        # Appending isn't idempotent: a retried PATCH would append the blocks again
+        return self._request('PATCH', url, json=data, idempotent=False)
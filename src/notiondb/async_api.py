@@ -0,0 +1,162 @@
+from .api import NotionApi
+from .exceptions import NotionConnectionError
+import asyncio
+import weakref
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class AsyncNotionApi(NotionApi):
+    """
+    asyncio client with the same endpoints as NotionApi, each one returning a coroutine:
+
+        api = AsyncNotionApi(token)
+        page = await api.get_page(id)
+        async for row in api.paginate(api.query_database, database_id):
+            ...
+
+    Built on a pooled httpx.AsyncClient, multiplexed over HTTP/2 when `h2` is installed.
+    Requires `pip install notiondb[async]`.
+    """
+
+    DEFAULT_POOL_SIZE = 100
+
+    # Event loop -> shared clients: httpx connections belong to the loop that opened them
+    _loop_clients = weakref.WeakKeyDictionary()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._inflight = {}
+
+    @classmethod
+    def shared(cls, token: str, **kwargs):
+        """
+        Return the client shared by every caller using the same token on the running event loop
+        """
+        loop = asyncio.get_running_loop()
+        with cls._shared_lock:
+            clients = cls._loop_clients.setdefault(loop, {})
+            api = clients.get((cls, token))
+            if api is None:
+                api = clients[(cls, token)] = cls(token, **kwargs)
+            return api
+
+    def _create_session(self):
+        if httpx is None:
+            raise ImportError('AsyncNotionApi requires httpx: pip install notiondb[async]')
+
+        limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+        return httpx.AsyncClient(headers=self.headers, limits=limits, timeout=self.timeout, http2=HTTP2_AVAILABLE)
+
+    async def _send(self, method: str, url: str, timeout: float = None, **kwargs):
+        response = None
+        for _ in range(self.RATE_LIMITED_RETRIES + 1):
+            if self.rate_limiter:
+                wait = self.rate_limiter.reserve()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            response = await self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            if response.status_code != 429:
+                break
+            if self.rate_limiter:
+                self.rate_limiter.pause(self.retry_after(response))
+            else:
+                await asyncio.sleep(self.retry_after(response))
+        return response
+
+    async def _request(self, method: str, url: str, timeout: float = None, idempotent: bool = None, **kwargs):
+        if method != 'GET':
+            response = await self._retrying_request(method, url, timeout=timeout, idempotent=idempotent, **kwargs)
+            # Queries and searches are POSTs marked idempotent: they write nothing
+            if not idempotent:
+                self._invalidate_cache(url, response)
+            return response
+
+        key = self._request_key(method, url, kwargs.get('params'))
+        if self.cache is None:
+            return await self._coalesced_request(key, method, url, timeout=timeout, idempotent=idempotent, **kwargs)
+
+        response = self.cache.get(key)
+        if response is not None:
+            return response
+        path = self._cache_path(url)
+        generation = self.cache.begin_read(path)
+        try:
+            response = await self._coalesced_request(key, method, url, timeout=timeout, idempotent=idempotent, **kwargs)
+            if response.status_code == 200:
+                self.cache.set(key, path, response, generation)
+        finally:
+            self.cache.end_read(path)
+        return response
+
+    async def _coalesced_request(self, key, method: str, url: str, timeout: float = None, idempotent: bool = None, **kwargs):
+        if not self.coalesce:
+            return await self._retrying_request(method, url, timeout=timeout, idempotent=idempotent, **kwargs)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._retrying_request(method, url, timeout=timeout, idempotent=idempotent, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # A caller being cancelled must not cancel the request shared with the others
+        return await asyncio.shield(task)
+
+    async def _retrying_request(self, method: str, url: str, timeout: float = None, idempotent: bool = None, **kwargs):
+        idempotent = self.retry.is_idempotent(method, idempotent)
+        attempt = 0
+        while True:
+            try:
+                response = await self._send(method, url, timeout=timeout, **kwargs)
+            except httpx.TransportError as e:
+                sent = not isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+                if not self.retry.should_retry_error(attempt, idempotent, sent=sent):
+                    raise NotionConnectionError(str(e)) from e
+            else:
+                if not self.retry.should_retry_status(attempt, response.status_code, idempotent):
+                    return response
+            await asyncio.sleep(self.retry.delay(attempt))
+            attempt += 1
+
+    async def get_page_property_items(self, id: str, property_id: str):
+        """
+        Every item of a paginated property (title, rich_text, relation, people, rollup), following next_cursor
+        """
+        items = []
+        start_cursor = None
+        while True:
+            result = await self.get_page_property(id, property_id, start_cursor=start_cursor, raise_errors=True)
+            if result.get('object') != 'list':
+                return [result]
+            items += result.get('results', [])
+            start_cursor = result.get('next_cursor')
+            if not start_cursor:
+                return items
+
+    async def close(self):
+        await self.session.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def paginate(self, method, *args, **kwargs):
+        """
+        Iterate over every result of a paginated endpoint, e.g. api.paginate(api.query_database, id, filter=filter)
+        """
+        start_cursor = kwargs.pop('start_cursor', None)
+        while True:
+            results, start_cursor = await method(*args, start_cursor=start_cursor, **kwargs)
+            for result in results or []:
+                yield result
+            if not start_cursor:
+                break
@@ -0,0 +1,183 @@
+from collections import OrderedDict
+import threading
+import time
+
+
+class ResponseCache:
+    """
+    Bounded TTL + LRU cache for GET responses of a client.
+
+    Entries expire after the TTL of their endpoint and the least recently used ones are
+    evicted beyond `max_entries` or `max_bytes`. Writes made through the same client
+    invalidate every entry of the objects they touch (a page is also a block, so
+    writing a page drops its page, block and children entries) and of their parent.
+    """
+
+    DEFAULT_TTL = {
+        'databases': 300,
+        'pages': 60,
+        'page_properties': 60,
+        'blocks': 60,
+        'block_children': 60,
+    }
+
+    def __init__(self, ttl: dict = None, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024):
+        self.ttl = dict(self.DEFAULT_TTL, **(ttl or {}))
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires, response, size, object ids)
+        self._keys = {}  # object id -> keys of the entries holding it
+        self._generations = {}  # object id -> writes seen while it was read, to drop responses read before a write
+        self._readers = {}  # object id -> GETs in flight
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def endpoint(path: str):
+        """
+        (endpoint, object id) of an API path relative to the version prefix, e.g. 'blocks/<id>/children'
+        """
+        parts = path.split('?', 1)[0].strip('/').split('/')
+        if len(parts) < 2:
+            return None, None
+        resource, id = parts[0], ResponseCache.normalize_id(parts[1])
+        if resource == 'blocks' and parts[2:] == ['children']:
+            return 'block_children', id
+        if resource == 'pages' and len(parts) > 2 and parts[2] == 'properties':
+            return 'page_properties', id
+        if len(parts) == 2 and resource in ('databases', 'pages', 'blocks'):
+            return resource, id
+        return None, None
+
+    @staticmethod
+    def normalize_id(id: str):
+        # Ids are accepted with or without dashes
+        return id.replace('-', '').lower() if id else id
+
+    def begin_read(self, path: str):
+        """
+        Generation of the object read by a GET about to be sent, for `set`; every call is
+        paired with `end_read` once the response is handled
+        """
+        _, id = self.endpoint(path)
+        with self._lock:
+            if id is not None:
+                self._readers[id] = self._readers.get(id, 0) + 1
+            return self._generations.get(id, 0)
+
+    def end_read(self, path: str):
+        _, id = self.endpoint(path)
+        if id is None:
+            return
+        with self._lock:
+            readers = self._readers.get(id, 0) - 1
+            if readers > 0:
+                self._readers[id] = readers
+            else:
+                # No response in flight can be stale any more
+                self._readers.pop(id, None)
+                self._generations.pop(id, None)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, path: str, response, generation: int = 0):
+        endpoint, id = self.endpoint(path)
+        ttl = self.ttl.get(endpoint)
+        if not ttl:
+            return
+        size = len(response.content or b'')
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            # The object was written while this response was in flight
+            if self._generations.get(id, 0) != generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            ids = (id,) + self.child_ids(endpoint, response)
+            self._entries[key] = (time.monotonic() + ttl, response, size, ids)
+            for id in ids:
+                self._keys.setdefault(id, set()).add(key)
+            self.size += size
+
+            while self._entries and (len(self._entries) > self.max_entries or self.size > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    @classmethod
+    def child_ids(cls, endpoint: str, response):
+        # A children list goes stale when one of its blocks changes, and responses of
+        # older Notion versions don't tell the parent of an updated or deleted block
+        if endpoint != 'block_children':
+            return ()
+        try:
+            results = response.json().get('results') or []
+        except (ValueError, AttributeError):
+            return ()
+        return tuple(cls.normalize_id(block.get('id')) for block in results if block.get('id'))
+
+    def _remove(self, key):
+        _, _, size, ids = self._entries.pop(key)
+        self.size -= size
+        for id in ids:
+            keys = self._keys.get(id)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self._keys[id]
+
+    def invalidate(self, *ids: str):
+        with self._lock:
+            for id in ids:
+                if not id:
+                    continue
+                id = self.normalize_id(id)
+                if id in self._readers:
+                    self._generations[id] = self._generations.get(id, 0) + 1
+                for key in list(self._keys.get(id, ())):
+                    self._remove(key)
+
+    def invalidate_write(self, path: str, result: dict = None):
+        """
+        Drop the entries made stale by a successful write to `path` returning `result`
+        """
+        _, id = self.endpoint(path)
+        ids = [id]
+        if isinstance(result, dict):
+            ids.append(result.get('id'))
+            parent = result.get('parent') or {}
+            ids.append(parent.get(parent.get('type')) if isinstance(parent, dict) else None)
+        self.invalidate(*ids)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys.clear()
+            self.size = 0
+
+    @property
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.size,
+            }
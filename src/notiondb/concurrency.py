@@ -0,0 +1,143 @@
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import contextvars
+import queue
+import threading
+
+
+class _Failure:
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_DONE = object()
+
+
+def read_ahead(fetch, start_cursor: str = None, depth: int = 1):
+    """
+    Iterate over the pages of a cursor-paginated endpoint, fetching up to `depth` pages
+    ahead on a background thread while the caller consumes the current one.
+
+    `fetch(cursor)` returns `(results, next_cursor)`.
+    """
+    pages = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def produce():
+        cursor = start_cursor
+        try:
+            while not stop.is_set():
+                results, cursor = fetch(cursor)
+                put(results or [])
+                if not cursor:
+                    break
+        except BaseException as e:
+            put(_Failure(e))
+        put(_DONE)
+
+    threading.Thread(target=produce, daemon=True).start()
+
+    try:
+        while True:
+            page = pages.get()
+            if page is _DONE:
+                return
+            if isinstance(page, _Failure):
+                raise page.error
+            yield page
+    finally:
+        # Caller stopped early: let the producer thread exit
+        stop.set()
+
+
+class BulkResult(namedtuple('BulkResult', ['index', 'input', 'result', 'error'])):
+    """
+    Outcome of one item of a bulk operation; `index` is the item's position in the input
+    """
+
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def run_concurrently(func, items, concurrency: int = 8, ordered: bool = False):
+    """
+    Call `func(item)` for every item on a thread pool and yield a BulkResult per item,
+    as soon as it completes or, with `ordered`, in input order.
+
+    Items are consumed lazily with at most `concurrency` calls in flight, so `items`
+    can be a stream. Failures are reported in the result instead of stopping the run.
+    """
+    items = enumerate(items)
+    pending = {}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+
+        def submit():
+            for index, item in items:
+                # Workers see the caller's context, e.g. its identity map
+                pending[executor.submit(contextvars.copy_context().run, func, item)] = (index, item)
+                return True
+            return False
+
+        for _ in range(concurrency):
+            if not submit():
+                break
+
+        while pending:
+            if ordered:
+                done = [next(iter(pending))]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                index, item = pending.pop(future)
+                try:
+                    result = BulkResult(index, item, future.result(), None)
+                except Exception as e:
+                    result = BulkResult(index, item, None, e)
+                submit()
+                yield result
+
+
+class SingleFlight:
+    """
+    Concurrent calls with the same key share one execution: the first caller runs it,
+    the others wait for its result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
@@ -1,16 +1,47 @@
 
 from .api import NotionApi
-from .block_parser import BlockParser
+from .async_api import AsyncNotionApi
+from .decoder import RowDecoder, complete_property, is_truncated
+from .identity_map import current_identity_map
+from .index import HashIndex, RowIndex, SortedIndex
+from .query_cache import QueryCache
+from .write_behind import WriteBehindQueue
 from .consts import *
 from .block import BaseBlock
-from .fields import BaseField
-from typing import List
+from .concurrency import read_ahead, run_concurrently
+from .fields import FIELD_TYPES, BaseField, LastEditedTimeField
+from .local_query import comparable
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Union
+import asyncio
+
+
+# Outcome of one row of upsert_many: action is 'created', 'updated' or 'unchanged'
+Upserted = namedtuple('Upserted', ['action', 'row'])
 
 
 class NotionDatabase(object):
 
-    def __init__(self, token: str, database_id: str = None, parent_id: str = None, title: str = None, properties: List[BaseField] = None):
-        self.api = NotionApi(token)
+    # Parallel requests for bulk reads and writes, still bound by the client's rate limit
+    DEFAULT_CONCURRENCY = 8
+
+    # Query pages fetched ahead of the caller by find(); 0 disables read-ahead
+    DEFAULT_PREFETCH = 1
+
+    MAX_PAGE_SIZE = 100
+
+    def __init__(self, token: str = None, database_id: str = None, parent_id: str = None, title: str = None, properties: List[BaseField] = None, api: NotionApi = None, query_cache: QueryCache = None, async_api: AsyncNotionApi = None):
+        # Databases built on the same token share one client and its connection pool
+        self.api = api or NotionApi.shared(token)
+        self._async_api = async_api
+        self._decoder = None
+        self._schema = None
+
+        # Optional QueryCache of find() results, revalidated with one probe request
+        self.query_cache = query_cache
+        self._row_index = None
+        self.write_behind = None
 
         self.id = database_id
 
@@ -22,6 +53,14 @@ class NotionDatabase(object):
             info = self.api.create_database(parent_id, title, properties=props_obj)
             self.id = info.get('id')
 
+    @property
+    def async_api(self):
+        # Unless given one, use the client shared on the running event loop, created on first use
+        # so sync-only code doesn't need httpx
+        if self._async_api is not None:
+            return self._async_api
+        return AsyncNotionApi.shared(self.api.token)
+
     def parse_database(self, db: dict):
         if db and 'title' in db:
             db['title'] = ''.join([line.get('plain_text', '') for line in db['title']])
@@ -34,67 +73,330 @@ class NotionDatabase(object):
 
     def info(self):
         info = self.api.get_database(self.id)
+        if info:
+            self.compile_decoder(info.get('properties'))
         info = self.parse_database(info)
         return info
 
+    def compile_decoder(self, schema: dict = None):
+        """
+        Build the row decoder from the database's properties schema, as returned by get_database
+        """
+        self._schema = schema
+        self._decoder = RowDecoder(schema)
+        return self._decoder
+
+    @property
+    def schema(self):
+        """
+        Properties schema of the database, fetched once
+        """
+        if self._schema is None and self.id:
+            self.info()
+        return self._schema or {}
+
+    def property_ids(self, names: List[str]):
+        """
+        Property ids for filter_properties; names missing from the schema are passed through as ids
+        """
+        schema = self.schema
+        return [schema[name].get('id', name) if name in schema else name for name in names]
+
+    @property
+    def decoder(self):
+        # Without a fetched schema, the decoder learns property types from the first rows it decodes
+        if self._decoder is None:
+            self._decoder = RowDecoder()
+        return self._decoder
+
     def update_database(self, title: str):
         info = self.api.update_database(self.id, title=title)
         info = self.parse_database(info)
         return info
 
-    def get_children(self, id: str):
-        blocks, next_cursor = self.api.get_block_children(id)
-        while next_cursor:
-            _blocks, next_cursor = self.api.get_block_children(id, start_cursor=next_cursor)
-            blocks += _blocks
+    def _get_block_children(self, id: str):
+        return list(self.api.paginate(self.api.get_block_children, id))
 
-        children = []
+    @staticmethod
+    def _check_max_depth(max_depth: int = None):
+        if max_depth is not None and max_depth < 1:
+            raise ValueError(f'max_depth must be at least 1 (direct children), got {max_depth}')
 
-        for block in blocks:
-            if block.get('has_children'):
-                block['children'] = self.get_children(block.get('id'))
+    @staticmethod
+    def _next_level(level: list, results: list, depth: int, max_depth: int = None):
+        next_level = []
+        for (_, children), blocks in zip(level, results):
+            children.extend(blocks)
+            if max_depth is not None and depth + 1 >= max_depth:
+                continue
+            for block in blocks:
+                if block.get('has_children'):
+                    block['children'] = []
+                    next_level.append((block.get('id'), block['children']))
+        return next_level
 
-            children.append(block)
+    def get_children(self, id: str, max_depth: int = None, concurrency: int = None):
+        """
+        Fetch the block tree one depth level at a time, requesting every block of a level concurrently.
+        max_depth=1 only fetches the direct children.
+        """
+        self._check_max_depth(max_depth)
+        children = []
+        level = [(id, children)]
+        depth = 0
+
+        with ThreadPoolExecutor(max_workers=concurrency or self.DEFAULT_CONCURRENCY) as executor:
+            while level:
+                results = list(executor.map(self._get_block_children, [block_id for block_id, _ in level]))
+                level = self._next_level(level, results, depth, max_depth)
+                depth += 1
 
         return children
 
+    def complete_properties(self, items: List[dict], concurrency: int = None):
+        """
+        Fetch the full value of truncated properties (e.g. relations over 25 items) of raw pages, in place.
+        Only truncated properties are requested, concurrently across the pages.
+        """
+        truncated = [(item, prop) for item in items for prop in item.get('properties', {}).values() if is_truncated(prop)]
+        if not truncated:
+            return items
+
+        fetch = lambda job: self.api.get_page_property_items(job[0].get('id'), job[1].get('id'))
+        for result in run_concurrently(fetch, truncated, concurrency=concurrency or self.DEFAULT_CONCURRENCY):
+            if not result.ok:
+                raise result.error
+            complete_property(result.input[1], result.result)
+        return items
+
+    def _parse_properties(self, item: dict):
+        return self.decoder.decode(item)
+
     def parse_item(self, item: dict, includes_children=True):
-        result = {
-            '_id': item.get('id'),
-        }
-        if item.get('archived'):
-            result.update({
-                '_archived': True,
-            })
-        properties = item.get('properties', {})
-        for prop in properties.keys():
-            result[prop] = BlockParser(properties[prop]).value
+        result = self._parse_properties(item)
 
         if includes_children:
             result['children'] = self.get_children(item.get('id'))
 
         return result
 
-    def find(self, filter: dict = None, sorts: List[dict] = None, start_cursor: str = None, page_size: int = None, includes_children=False):
-        rows, next_cursor = self.api.query_database(self.id, filter=filter, sorts=sorts, start_cursor=start_cursor, page_size=page_size)
-        for row in rows:
-            yield self.parse_item(row, includes_children)
+    @classmethod
+    def _page_size(cls, page_size: int = None, limit: int = None, fetched: int = 0):
+        if page_size or limit is None:
+            return page_size
+        return min(limit - fetched, cls.MAX_PAGE_SIZE)
+
+    def _iter_pages(self, filter: dict = None, sorts: List[dict] = None, start_cursor: str = None, page_size: int = None, prefetch: int = None, limit: int = None, filter_properties: List[str] = None):
+        """
+        Raw result pages of query_database, with up to `prefetch` pages fetched ahead in the background.
+        Pagination stops once `limit` rows have been fetched.
+        """
+        fetched = 0
+
+        def fetch(cursor):
+            nonlocal fetched
+            rows, next_cursor = self.api.query_database(self.id, filter=filter, sorts=sorts, start_cursor=cursor, page_size=self._page_size(page_size, limit, fetched), filter_properties=filter_properties)
+            fetched += len(rows or [])
+            if limit is not None and fetched >= limit:
+                next_cursor = None
+            return rows, next_cursor
+
+        prefetch = self.DEFAULT_PREFETCH if prefetch is None else prefetch
+        if prefetch > 0:
+            yield from read_ahead(fetch, start_cursor=start_cursor, depth=prefetch)
+            return
+
+        cursor = start_cursor
+        while True:
+            rows, cursor = fetch(cursor)
+            yield rows or []
+            if not cursor:
+                break
+
+    def _cached_pages(self, filter: dict = None, sorts: List[dict] = None, page_size: int = None, prefetch: int = None, limit: int = None, filter_properties: List[str] = None):
+        """
+        Result pages from the query cache when the database hasn't changed since they were fetched,
+        otherwise from the API, storing them once the caller has consumed every page
+        """
+        cache = self.query_cache
+        key = cache.key(self.id, filter, sorts, filter_properties, limit)
+        fetched_at = cache.now()
+        watermark = cache.probe(self.api, self.id)
+
+        rows = cache.get(key, watermark)
+        if rows is not None:
+            yield rows
+            return
 
-        if next_cursor:
-            yield from self.find(filter=filter, sorts=sorts, start_cursor=next_cursor, page_size=page_size, includes_children=includes_children)
+        pages = []
+        for rows in self._iter_pages(filter=filter, sorts=sorts, page_size=page_size, prefetch=prefetch, limit=limit, filter_properties=filter_properties):
+            pages.append(rows)
+            yield rows
+        # Rows were completed in place by find() while the pages were consumed
+        cache.set(key, self.id, watermark, fetched_at, [row for rows in pages for row in rows])
 
-    def find_one(self, id: str, includes_children=False):
-        item = self.api.get_page(id)
+    def find(self, filter: dict = None, sorts: List[dict] = None, start_cursor: str = None, page_size: int = None, includes_children=False, prefetch: int = None, limit: int = None, lazy: bool = False, only: List[str] = None, complete: bool = True):
+        """
+        Yield the rows matching `filter`. With `lazy`, rows are LazyRow mappings decoding each property on first access.
+        `only` limits the properties downloaded and decoded to the given property names.
+        With `complete`, truncated relation, people and text values are fetched in full.
+        """
+        if limit is not None and limit <= 0:
+            return
+        filter_properties = self.property_ids(only) if only else None
+        decode_rows = self.decoder.lazy_rows if lazy else self.decoder.decode_rows
+        if self.query_cache is not None and start_cursor is None and complete:
+            pages = self._cached_pages(filter=filter, sorts=sorts, page_size=page_size, prefetch=prefetch, limit=limit, filter_properties=filter_properties)
+        else:
+            pages = self._iter_pages(filter=filter, sorts=sorts, start_cursor=start_cursor, page_size=page_size, prefetch=prefetch, limit=limit, filter_properties=filter_properties)
+        cnt = 0
+        for rows in pages:
+            if limit is not None:
+                rows = rows[:limit - cnt]
+            if complete:
+                self.complete_properties(rows)
+            for item in decode_rows(rows):
+                if includes_children:
+                    item['children'] = self.get_children(item['_id'])
+                yield item
+            cnt += len(rows)
+
+    def edited_since(self, watermark: str):
+        """
+        Filter for the pages edited on or after `watermark`, on the database's last edited time
+        property when it has one, otherwise on the page timestamp
+        """
+        for name, prop in self.schema.items():
+            if prop.get('type') == 'last_edited_time':
+                return LastEditedTimeField(name).query_filter({'on_or_after': watermark})
+        return {
+            'timestamp': 'last_edited_time',
+            'last_edited_time': {'on_or_after': watermark},
+        }
+
+    """
+    INDEXES
+    """
+    def create_index(self, name: str, kind: str = 'hash'):
+        """
+        Index the rows on property `name` in memory: 'hash' for find_by, 'sorted' for find_by and find_range.
+        Rows are loaded with one full scan the first time, then kept current by refresh_indexes()
+        and by the writes made through this database.
+        """
+        if kind not in ('hash', 'sorted'):
+            raise ValueError(f'Unknown index kind: {kind}')
+        if self._row_index is None:
+            self._row_index = RowIndex()
+        self._row_index.add_index(HashIndex(name) if kind == 'hash' else SortedIndex(name))
+        if self._row_index.watermark is None:
+            self.refresh_indexes(full=True)
+
+    def refresh_indexes(self, full: bool = False):
+        """
+        Pull the pages edited since the last refresh into the indexes (every page with `full`).
+        Pages archived elsewhere aren't returned by queries and are only dropped by a full refresh.
+        Returns the number of rows pulled.
+        """
+        row_index = self._row_index
+        if row_index is None:
+            return 0
+
+        watermark = None if full else row_index.watermark
+        filter = self.edited_since(watermark) if watermark else None
+        sorts = [{'timestamp': 'last_edited_time', 'direction': 'ascending'}]
+
+        seen = set()
+        for rows in self._iter_pages(filter=filter, sorts=sorts):
+            self.complete_properties(rows)
+            for item, row in zip(rows, self.decoder.decode_rows(rows)):
+                row_index.put(row)
+                seen.add(row['_id'])
+                edited = item.get('last_edited_time')
+                if edited and (watermark is None or edited > watermark):
+                    watermark = edited
+
+        if full:
+            for id in [id for id in row_index.rows if id not in seen]:
+                row_index.discard(id)
+        # An empty database still counts as loaded
+        row_index.watermark = watermark or ''
+        return len(seen)
+
+    def find_by(self, name: str, value):
+        """
+        Rows whose indexed property `name` equals `value` (or contains it, for multi-select and relation),
+        answered from memory
+        """
+        if self._row_index is None:
+            raise KeyError(f'No index on {name!r}, see create_index')
+        return self._row_index.find(name, value)
+
+    def find_range(self, name: str, low=None, high=None):
+        """
+        Rows with low <= `name` <= high on a sorted index, in ascending order; a missing bound is open
+        """
+        if self._row_index is None:
+            raise KeyError(f'No index on {name!r}, see create_index')
+        return self._row_index.range(name, low, high)
+
+    def find_one(self, id: str, includes_children=False, only: List[str] = None, complete: bool = True):
+        load = lambda: self._find_one(id, includes_children=includes_children, only=only, complete=complete)
+
+        # Inside an IdentityMap, each page is loaded once
+        identity_map = current_identity_map()
+        if identity_map is not None and not includes_children and not only:
+            return identity_map.get_row(id, load)
+        return load()
+
+    def _find_one(self, id: str, includes_children=False, only: List[str] = None, complete: bool = True):
+        filter_properties = self.property_ids(only) if only else None
+        item = self.api.get_page(id, filter_properties=filter_properties)
         if item:
+            if complete:
+                self.complete_properties([item])
             return self.parse_item(item, includes_children=includes_children)
         return None
 
+    def _updated(self, item: dict):
+        if self._row_index is not None and item:
+            self._row_index.put(item)
+        if self.query_cache is not None:
+            # Archived pages leave results without changing what the cache probes
+            self.query_cache.invalidate(self.id)
+        identity_map = current_identity_map()
+        if identity_map is not None and item:
+            if item.get('_archived'):
+                identity_map.forget(item['_id'])
+            else:
+                identity_map.set_row(item['_id'], item)
+        return item
+
     def update_one(self, id: str, properties: dict):
         item = self.api.update_page(id, properties=properties)
         if item:
-            return self.parse_item(item, includes_children=False)
+            return self._updated(self.parse_item(item, includes_children=False))
         return None
 
+    def enable_write_behind(self, flush_interval: float = 1.0, journal: str = None, concurrency: int = None):
+        """
+        Queue NotionModel.save() updates and write them in the background every `flush_interval` seconds,
+        merging the updates of a page into one request. See WriteBehindQueue.
+        """
+        if self.write_behind is None:
+            self.write_behind = WriteBehindQueue(self, flush_interval=flush_interval, journal=journal, concurrency=concurrency)
+        return self.write_behind
+
+    def disable_write_behind(self):
+        if self.write_behind is not None:
+            self.write_behind.close()
+            self.write_behind = None
+
+    def flush(self):
+        """
+        Write the queued updates now
+        """
+        return self.write_behind.flush() if self.write_behind is not None else []
+
     def append_children(self, id: str, blocks: List[BaseBlock]):
         children = [block.value for block in blocks]
         item = self.api.append_block_children(id, children=children)
@@ -105,20 +407,264 @@ class NotionDatabase(object):
     def insert_one(self, properties: dict, children: List[dict] = None):
         item = self.api.create_page('database_id', self.id, properties=properties, children=children)
         if item:
-            return self.parse_item(item, includes_children=False)
+            return self._updated(self.parse_item(item, includes_children=False))
         return None
 
+    def insert_many(self, rows: Iterable[dict], concurrency: int = None, ordered: bool = False, parse: bool = True):
+        """
+        Create a page for every properties dict in `rows`, with up to `concurrency` requests in flight.
+
+        Yields a BulkResult per row as it completes (in input order with `ordered`): `result` is the
+        parsed item, or the raw page with parse=False, and `error` the exception of a failed row.
+        """
+        def insert(properties):
+            item = self.api.create_page('database_id', self.id, properties=properties, raise_errors=True)
+            if parse or self._row_index is not None:
+                # Indexes need the decoded row even when the caller doesn't
+                row = self._updated(self._parse_properties(item))
+                return row if parse else item
+            return item
+
+        yield from run_concurrently(insert, rows, concurrency=concurrency or self.DEFAULT_CONCURRENCY, ordered=ordered)
+
+    def property_value(self, name: str, value):
+        """
+        Update payload of property `name` set to a plain value, using the field class of its type in the schema
+        """
+        type = self.schema.get(name, {}).get('type')
+        field_cls = FIELD_TYPES.get(type)
+        if field_cls is None:
+            raise ValueError(f'Property {name!r} of type {type!r} can\'t be written')
+        if type == 'date' and isinstance(value, str):
+            value = {'start': value}
+        field = field_cls(name)
+        field.value = value
+        return field.update_prop or {name: {type: None}}
+
+    def upsert_many(self, rows: Iterable[dict], key: str, concurrency: int = None, ordered: bool = False):
+        """
+        Insert or update rows of plain values ({'SKU': 'K-1', 'Price': 2.5}) matched on the unique property `key`.
+
+        One scan, projected to `key` and the incoming properties, maps keys to pages; then only the
+        rows that are new or differ from the page are written, with up to `concurrency` requests in flight.
+        Yields a BulkResult per row whose `result` is Upserted(action, row).
+        """
+        rows = list(rows)
+        names = [key] + sorted({name for row in rows for name in row if name != key})
+        schema = self.schema
+        types = {name: schema.get(name, {}).get('type') for name in names}
+
+        def key_of(value):
+            value = comparable(types[key], value)
+            return tuple(value) if isinstance(value, list) else value
+
+        existing = {}
+        pages = list(self.api.paginate(self.api.query_database, self.id, filter_properties=self.property_ids(names), raise_errors=True))
+        self.complete_properties(pages, concurrency=concurrency)
+        for row in self.decoder.decode_rows(pages):
+            # Rows already sharing a key: the first one is kept up to date
+            existing.setdefault(key_of(row.get(key)), row)
+
+        # Keys are claimed in input order: a later row repeating a key fails instead of creating a duplicate
+        claimed = set()
+        duplicates = set()
+        for row in rows:
+            value = key_of(row.get(key))
+            if value in claimed:
+                duplicates.add(id(row))
+            claimed.add(value)
+
+        def upsert(row):
+            value = key_of(row.get(key))
+            if value in (None, '', ()):
+                raise ValueError(f'Row has no {key!r}')
+            if id(row) in duplicates:
+                raise ValueError(f'Duplicate {key!r} {row.get(key)!r}')
+
+            current = existing.get(value)
+            if current is None:
+                properties = {}
+                for name, new_value in row.items():
+                    properties.update(self.property_value(name, new_value))
+                item = self.api.create_page('database_id', self.id, properties=properties, raise_errors=True)
+                return Upserted('created', self._updated(self._parse_properties(item)))
+
+            properties = {}
+            for name, new_value in row.items():
+                if comparable(types[name], new_value) != comparable(types[name], current.get(name)):
+                    properties.update(self.property_value(name, new_value))
+            if not properties:
+                return Upserted('unchanged', current)
+            item = self.api.update_page(current['_id'], properties=properties, raise_errors=True)
+            return Upserted('updated', self._updated(self._parse_properties(item)))
+
+        yield from run_concurrently(upsert, rows, concurrency=concurrency or self.DEFAULT_CONCURRENCY, ordered=ordered)
+
     def delete_one(self, id: str):
         item = self.api.update_page(id, archived=True)
         if item:
-            return self.parse_item(item, includes_children=False)
+            return self._updated(self.parse_item(item, includes_children=False))
         return None
 
-    def delete_many(self, ids: List[str]):
-        result = []
-        for id in ids:
-            item = self.delete_one(id=id)
-            if item:
-                result.append(item)
+    def iter_ids(self, ids_or_filter: Union[Iterable[str], dict] = None, until_exhausted: bool = False):
+        """
+        Page ids from an iterable, or streamed from query_database when given a filter dict (None matches every row).
+
+        With `until_exhausted`, the query is run again until it returns no unseen id, for callers that
+        remove rows from the result set while it is paginated.
+        """
+        if ids_or_filter is not None and not isinstance(ids_or_filter, dict):
+            yield from ids_or_filter
+            return
+
+        seen = set()
+        while True:
+            found = False
+            for rows in self._iter_pages(filter=ids_or_filter):
+                for row in rows:
+                    id = row.get('id')
+                    if id not in seen:
+                        seen.add(id)
+                        found = True
+                        yield id
+            if not until_exhausted or not found:
+                break
+
+    @staticmethod
+    def _check_bulk_target(ids_or_filter):
+        # Bulk writes never default to every row: an empty filter {} has to be given for that
+        if ids_or_filter is None:
+            raise ValueError('Pass page ids or a filter; use an empty filter {} to write every row')
+
+    def update_many(self, ids_or_filter: Union[Iterable[str], dict], properties: dict, concurrency: int = None, ordered: bool = False):
+        """
+        Set `properties` on every page given by id or matched by a filter, with up to `concurrency` requests in flight.
+        Matching ids are streamed into the workers while the query is still paginating; as updated
+        rows may leave the results (e.g. Status Todo -> Done), the query is run again until it finds
+        no row left to update. Yields a BulkResult per page, `input` being the page id.
+        An empty filter {} matches every row.
+        """
+        self._check_bulk_target(ids_or_filter)
+
+        def update(id):
+            item = self.api.update_page(id, properties=properties, raise_errors=True)
+            return self._updated(self._parse_properties(item))
+
+        return run_concurrently(update, self.iter_ids(ids_or_filter, until_exhausted=True), concurrency=concurrency or self.DEFAULT_CONCURRENCY, ordered=ordered)
+
+    def archive_many(self, ids_or_filter: Union[Iterable[str], dict], concurrency: int = None, ordered: bool = False):
+        """
+        Archive every page given by id or matched by a filter ({} for every row); yields a BulkResult per page
+        """
+        self._check_bulk_target(ids_or_filter)
+
+        def archive(id):
+            item = self.api.update_page(id, archived=True, raise_errors=True)
+            return self._updated(self._parse_properties(item))
+
+        return run_concurrently(archive, self.iter_ids(ids_or_filter, until_exhausted=True), concurrency=concurrency or self.DEFAULT_CONCURRENCY, ordered=ordered)
+
+    def delete_many(self, ids: Union[List[str], dict], concurrency: int = None):
+        return [result.result for result in self.archive_many(ids, concurrency=concurrency) if result.ok]
+
+
+    """
+    ASYNC
+    """
+    async def aget_children(self, id: str, max_depth: int = None, concurrency: int = None):
+        self._check_max_depth(max_depth)
+        semaphore = asyncio.Semaphore(concurrency or self.DEFAULT_CONCURRENCY)
+
+        async def get_block_children(block_id):
+            async with semaphore:
+                return [block async for block in self.async_api.paginate(self.async_api.get_block_children, block_id)]
+
+        children = []
+        level = [(id, children)]
+        depth = 0
+
+        while level:
+            results = await asyncio.gather(*[get_block_children(block_id) for block_id, _ in level])
+            level = self._next_level(level, results, depth, max_depth)
+            depth += 1
+
+        return children
+
+    async def acomplete_properties(self, items: List[dict], concurrency: int = None):
+        """
+        Async complete_properties: fetch the full value of truncated properties of raw pages, in place
+        """
+        truncated = [(item, prop) for item in items for prop in item.get('properties', {}).values() if is_truncated(prop)]
+        if not truncated:
+            return items
+
+        semaphore = asyncio.Semaphore(concurrency or self.DEFAULT_CONCURRENCY)
+
+        async def complete(item, prop):
+            async with semaphore:
+                complete_property(prop, await self.async_api.get_page_property_items(item.get('id'), prop.get('id')))
+
+        await asyncio.gather(*[complete(item, prop) for item, prop in truncated])
+        return items
+
+    async def aparse_item(self, item: dict, includes_children=True):
+        result = self._parse_properties(item)
+
+        if includes_children:
+            result['children'] = await self.aget_children(item.get('id'))
+
         return result
 
+    async def afind(self, filter: dict = None, sorts: List[dict] = None, start_cursor: str = None, page_size: int = None, includes_children=False, limit: int = None, only: List[str] = None, complete: bool = True):
+        if limit is not None and limit <= 0:
+            return
+        filter_properties = self.property_ids(only) if only else None
+        query = lambda cursor, fetched: asyncio.ensure_future(self.async_api.query_database(self.id, filter=filter, sorts=sorts, start_cursor=cursor, page_size=self._page_size(page_size, limit, fetched), filter_properties=filter_properties))
+
+        cnt = 0
+        task = query(start_cursor, 0)
+        try:
+            while task:
+                rows, next_cursor = await task
+                rows = rows or []
+                # Fetch the next page while the caller handles this one
+                fetched = cnt + len(rows)
+                task = query(next_cursor, fetched) if next_cursor and (limit is None or fetched < limit) else None
+                if limit is not None:
+                    rows = rows[:limit - cnt]
+                if complete:
+                    await self.acomplete_properties(rows)
+                for row in rows:
+                    yield await self.aparse_item(row, includes_children)
+                    cnt += 1
+                    if limit is not None and cnt >= limit:
+                        return
+        finally:
+            if task:
+                task.cancel()
+
+    async def afind_one(self, id: str, includes_children=False, complete: bool = True):
+        item = await self.async_api.get_page(id)
+        if item:
+            if complete:
+                await self.acomplete_properties([item])
+            return await self.aparse_item(item, includes_children=includes_children)
+        return None
+
+    async def aupdate_one(self, id: str, properties: dict):
+        item = await self.async_api.update_page(id, properties=properties)
+        if item:
+            return self._updated(self._parse_properties(item))
+        return None
+
+    async def ainsert_one(self, properties: dict, children: List[dict] = None):
+        item = await self.async_api.create_page('database_id', self.id, properties=properties, children=children)
+        if item:
+            return self._updated(self._parse_properties(item))
+        return None
+
+    async def adelete_one(self, id: str):
+        item = await self.async_api.update_page(id, archived=True)
+        if item:
+            return self._updated(self._parse_properties(item))
+        return None
@@ -0,0 +1,209 @@
+from .consts import *
+from collections.abc import MutableMapping
+from datetime import datetime
+from functools import lru_cache
+from typing import List
+
+
+"""
+Property decoders, one per property type, matching BlockParser's output
+"""
+def decode_rich_text(value):
+    if value is None:
+        return None
+    return ''.join([line.get('plain_text', '') for line in value])
+
+
+def decode_raw(value):
+    return value
+
+
+def decode_select(value):
+    if value:
+        value['background'] = COLORS_DICT.get(value.get('color', '') + '_background')
+    return value
+
+
+def decode_multi_select(value):
+    if not value:
+        return []
+    for item in value:
+        item['background'] = COLORS_DICT.get(item.get('color', '') + '_background')
+    return value
+
+
+def decode_relation(value):
+    return [] if not value else [item.get('id') for item in value]
+
+
+@lru_cache(maxsize=4096)
+def decode_time(value):
+    # Timestamps repeat a lot (Notion rounds them to the minute), so parsed values are cached
+    try:
+        return datetime.strptime(value[:-2], '%Y-%m-%dT%H:%M:%S.%f')
+    except (TypeError, ValueError):
+        return None
+
+
+def decode_none(value):
+    return None
+
+
+PROPERTY_DECODERS = {
+    'rich_text': decode_rich_text,
+    'text': decode_rich_text,
+    'title': decode_rich_text,
+    'number': decode_raw,
+    'checkbox': decode_raw,
+    'date': decode_raw,
+    'url': decode_raw,
+    'select': decode_select,
+    'multi_select': decode_multi_select,
+    'relation': decode_relation,
+    'created_time': decode_time,
+    'last_edited_time': decode_time,
+}
+
+
+class RowDecoder:
+    """
+    Decodes pages of a database with a table of property name -> (type, decode function)
+    compiled once from the database schema. Properties missing from the schema are
+    added to the table the first time they are seen.
+    """
+
+    def __init__(self, schema: dict = None):
+        self.table = {}
+        for name, prop in (schema or {}).items():
+            self.table[name] = self.compile(prop.get('type'))
+
+    @staticmethod
+    def compile(type: str):
+        return type, PROPERTY_DECODERS.get(type, decode_none)
+
+    def decode_property(self, name: str, prop: dict):
+        type = prop['type']
+        entry = self.table.get(name)
+        if entry is None or entry[0] != type:
+            entry = self.table[name] = self.compile(type)
+        return entry[1](prop[type])
+
+    def decode_properties(self, properties: dict, result: dict):
+        table = self.table
+        for name, prop in properties.items():
+            type = prop['type']
+            entry = table.get(name)
+            if entry is None or entry[0] != type:
+                entry = table[name] = self.compile(type)
+            result[name] = entry[1](prop[type])
+        return result
+
+    def decode(self, item: dict):
+        result = {
+            '_id': item.get('id'),
+        }
+        if item.get('archived'):
+            result['_archived'] = True
+        return self.decode_properties(item.get('properties', {}), result)
+
+    def decode_rows(self, items: List[dict]):
+        decode = self.decode
+        return [decode(item) for item in items]
+
+    def lazy_rows(self, items: List[dict]):
+        return [LazyRow(item, self) for item in items]
+
+
+# Page objects embed at most this many items of these property types
+TRUNCATED_LIMIT = 25
+
+TRUNCATED_TYPES = ('title', 'rich_text', 'relation', 'people')
+
+
+def is_truncated(prop: dict):
+    """
+    Whether a page property value may hold only the first items of a longer list
+    """
+    type = prop.get('type')
+    if type not in TRUNCATED_TYPES:
+        return False
+    if 'has_more' in prop:
+        return bool(prop['has_more'])
+    value = prop.get(type) or []
+    if len(value) < TRUNCATED_LIMIT:
+        return False
+    if type in ('title', 'rich_text'):
+        # Only mentions count towards the limit of text values
+        return any(item.get('type') == 'mention' for item in value)
+    return True
+
+
+def complete_property(prop: dict, items: List[dict]):
+    """
+    Replace a truncated property value with the items retrieved from the page property endpoint
+    """
+    type = prop['type']
+    prop[type] = [item.get(type) for item in items]
+    prop['has_more'] = False
+    return prop
+
+
+_MISSING = object()
+
+
+class LazyRow(MutableMapping):
+    """
+    Row mapping that keeps the raw page and decodes a property the first time it is read.
+
+    Behaves like the dict returned by NotionDatabase.parse_item (row['Name'], row['_id'],
+    row.get(...), iteration in the same key order); use dict(row) for a plain dict.
+    """
+
+    __slots__ = ('raw', '_properties', '_decoder', '_values')
+
+    def __init__(self, item: dict, decoder: RowDecoder):
+        self.raw = item
+        self._properties = item.get('properties', {})
+        self._decoder = decoder
+
+        self._values = {
+            '_id': item.get('id'),
+        }
+        if item.get('archived'):
+            self._values['_archived'] = True
+
+    def __getitem__(self, key):
+        value = self._values.get(key, _MISSING)
+        if value is _MISSING:
+            prop = self._properties[key]
+            value = self._values[key] = self._decoder.decode_property(key, prop)
+        return value
+
+    def __setitem__(self, key, value):
+        self._values[key] = value
+
+    def __delitem__(self, key):
+        if key in self._properties:
+            self._properties = {name: prop for name, prop in self._properties.items() if name != key}
+            self._values.pop(key, None)
+        else:
+            del self._values[key]
+
+    def __contains__(self, key):
+        return key in self._values or key in self._properties
+
+    def __iter__(self):
+        values = self._values
+        for key in ('_id', '_archived'):
+            if key in values:
+                yield key
+        yield from self._properties
+        for key in values:
+            if key not in self._properties and key not in ('_id', '_archived'):
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f'LazyRow({dict(self)!r})'
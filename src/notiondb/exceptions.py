@@ -0,0 +1,57 @@
+class NotionApiError(Exception):
+
+    def __init__(self, message: str = None, status: int = None, code: str = None, response=None):
+        super().__init__(message or code or f'HTTP {status}')
+        self.message = message
+        self.status = status
+        self.code = code  # Notion error code, e.g. 'object_not_found'
+        self.response = response
+
+    def __str__(self):
+        message = self.message or self.args[0]
+        if self.code:
+            message = f'{self.code}: {message}'
+        if self.status is not None:
+            message = f'[{self.status}] {message}'
+        return message
+
+    @classmethod
+    def from_response(cls, response):
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        if not isinstance(body, dict):
+            body = {}
+
+        status = response.status_code
+        if status == 404:
+            error_cls = NotionNotFoundError
+        elif status == 429:
+            error_cls = NotionRateLimitedError
+        elif status in NotionTransientError.STATUSES:
+            error_cls = NotionTransientError
+        else:
+            error_cls = cls
+        reason = getattr(response, 'reason', None) or getattr(response, 'reason_phrase', None)
+        return error_cls(body.get('message') or reason, status=status, code=body.get('code'), response=response)
+
+
+class NotionNotFoundError(NotionApiError):
+    pass
+
+
+class NotionTransientError(NotionApiError):
+    """
+    Failure that may succeed when retried: 409 conflicts, 5xx responses, timeouts and dropped connections
+    """
+
+    STATUSES = (409, 500, 502, 503, 504)
+
+
+class NotionRateLimitedError(NotionTransientError):
+    pass
+
+
+class NotionConnectionError(NotionTransientError):
+    pass
@@ -1,7 +1,7 @@
-
-
 class BaseField:
 
+    __slots__ = ('name', 'default', '_value', '_updated')
+
     type = None
 
     def __init__(self, name: str, default = None):
@@ -10,6 +10,28 @@ class BaseField:
         self._value = default
         self._updated = False
 
+    @classmethod
+    def _all_slots(cls):
+        slots = cls.__dict__.get('_slots_cache')
+        if slots is None:
+            slots = tuple(slot for klass in cls.__mro__ for slot in klass.__dict__.get('__slots__', ()) if slot != '__dict__')
+            cls._slots_cache = slots
+        return slots
+
+    def copy(self):
+        """
+        Fresh, unset copy of this field, e.g. for a new model instance
+        """
+        cls = type(self)
+        field = cls.__new__(cls)
+        for slot in cls._all_slots():
+            setattr(field, slot, getattr(self, slot, None))
+        if hasattr(self, '__dict__'):
+            field.__dict__.update(self.__dict__)
+        field._value = self.default
+        field._updated = False
+        return field
+
     @property
     def value(self):
         return self._value
@@ -65,6 +87,8 @@ class BaseField:
 # Primary key
 class TitleField(BaseField):
 
+    __slots__ = ()
+
     type = 'title'
 
     @property
@@ -80,11 +104,15 @@ class TitleField(BaseField):
 
 class RichTextField(TitleField):
 
+    __slots__ = ()
+
     type = 'rich_text'
 
 
 class NumberField(BaseField):
 
+    __slots__ = ('format',)
+
     type = 'number'
 
     def __init__(self, name, default=None, format=None):
@@ -98,16 +126,22 @@ class NumberField(BaseField):
 
 class CheckboxField(BaseField):
 
+    __slots__ = ()
+
     type = 'checkbox'
 
 
 class UrlField(BaseField):
 
+    __slots__ = ()
+
     type = 'url'
 
 
 class SelectField(BaseField):
 
+    __slots__ = ('options',)
+
     type = 'select'
 
     def __init__(self, name, default=None, options=None):
@@ -127,6 +161,8 @@ class SelectField(BaseField):
 
 class MultiSelectField(SelectField):
 
+    __slots__ = ()
+
     type = 'multi_select'
 
     @property
@@ -136,11 +172,15 @@ class MultiSelectField(SelectField):
 
 class DateField(BaseField):
 
+    __slots__ = ()
+
     type = 'date'
 
 
 class CreatedTimeField(BaseField):
 
+    __slots__ = ()
+
     type = 'created_time'
 
     @property
@@ -149,14 +189,31 @@ class CreatedTimeField(BaseField):
 
 
 class LastEditedTimeField(CreatedTimeField):
+
+    __slots__ = ()
   
     type = 'last_edited_time'
 
 
 class RelationField(BaseField):
 
+    __slots__ = ('related',)
+
     type = 'relation'
 
+    def __init__(self, name, default=None):
+        super().__init__(name, default=default)
+
+        # Related models, attached by QuerySet.prefetch_related
+        self.related = None
+
     @property
     def update_value(self):
         return [{'id': value} for value in self.value]
+
+
+# Writable property type -> field class
+FIELD_TYPES = {
+    field.type: field
+    for field in (TitleField, RichTextField, NumberField, CheckboxField, UrlField, SelectField, MultiSelectField, DateField, RelationField)
+}
@@ -0,0 +1,72 @@
+from .concurrency import SingleFlight
+from contextvars import ContextVar
+import threading
+
+
+_current = ContextVar('notiondb_identity_map', default=None)
+
+# Tokens of the maps entered in the current context, so one map can be entered from several threads
+_tokens = ContextVar('notiondb_identity_map_tokens', default=())
+
+
+def current_identity_map():
+    return _current.get()
+
+
+class IdentityMap:
+    """
+    Request-scoped cache of loaded pages: inside `with IdentityMap():` each page id is
+    loaded once by NotionDatabase.find_one, and NotionModel.from_id returns the same
+    model instance for the same id. Concurrent loads of one id share a single request.
+
+    Workers started by bulk operations inherit the map; other threads can share it by
+    entering the same instance.
+    """
+
+    def __init__(self):
+        self.rows = {}
+        self.models = {}
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+
+    def __enter__(self):
+        _tokens.set(_tokens.get() + (_current.set(self),))
+        return self
+
+    def __exit__(self, *exc):
+        tokens = _tokens.get()
+        _tokens.set(tokens[:-1])
+        _current.reset(tokens[-1])
+
+    def get_row(self, id: str, load):
+        row = self.rows.get(id)
+        if row is None:
+            row = self._flights.do(('row', id), load)
+            if row is not None:
+                with self._lock:
+                    row = self.rows.setdefault(id, row)
+        return row
+
+    def get_model(self, model_cls, id: str, load):
+        key = (model_cls, id)
+        model = self.models.get(key)
+        if model is None:
+            model = self._flights.do(('model',) + key, load)
+            with self._lock:
+                model = self.models.setdefault(key, model)
+        return model
+
+    def set_row(self, id: str, row: dict):
+        with self._lock:
+            self.rows[id] = row
+
+    def forget(self, id: str):
+        with self._lock:
+            self.rows.pop(id, None)
+            for key in [key for key in self.models if key[1] == id]:
+                del self.models[key]
+
+    def clear(self):
+        with self._lock:
+            self.rows.clear()
+            self.models.clear()
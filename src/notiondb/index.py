@@ -0,0 +1,156 @@
+from .local_query import to_datetime, to_list
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+import threading
+
+
+class HashIndex:
+    """
+    Equality index of a property: value -> page ids. Selects are indexed by option name,
+    multi-selects and relations by each of their items, dates by their start.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._ids = {}
+
+    @staticmethod
+    def keys(value):
+        if value is None or value == '' or value == []:
+            return []
+        if isinstance(value, dict):
+            return [value.get('name') if 'name' in value else value.get('start')]
+        if isinstance(value, list):
+            return to_list(value)
+        return [value]
+
+    def add(self, id: str, row: dict):
+        for key in self.keys(row.get(self.name)):
+            self._ids.setdefault(key, set()).add(id)
+
+    def remove(self, id: str, row: dict):
+        for key in self.keys(row.get(self.name)):
+            ids = self._ids.get(key)
+            if ids:
+                ids.discard(id)
+                if not ids:
+                    del self._ids[key]
+
+    def get(self, value):
+        return self._ids.get(value, set())
+
+
+class SortedIndex:
+    """
+    Range index of a number, date or text property, kept as a sorted list of (value, page id)
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._entries = []
+
+    @staticmethod
+    def key(value):
+        if value is None or value == '':
+            return None
+        if isinstance(value, dict):
+            return to_datetime(value)
+        if isinstance(value, bool):
+            return int(value)
+        return value
+
+    def bound(self, value):
+        # Date bounds can be given as ISO strings
+        if isinstance(value, str) and self._entries and isinstance(self._entries[0][0], datetime):
+            return to_datetime(value)
+        return self.key(value) if isinstance(value, dict) else value
+
+    def add(self, id: str, row: dict):
+        key = self.key(row.get(self.name))
+        if key is not None:
+            insort(self._entries, (key, id))
+
+    def remove(self, id: str, row: dict):
+        key = self.key(row.get(self.name))
+        if key is None:
+            return
+        i = bisect_left(self._entries, (key, id))
+        if i < len(self._entries) and self._entries[i] == (key, id):
+            del self._entries[i]
+
+    def get(self, value):
+        key = self.bound(value)
+        start = bisect_left(self._entries, (key,))
+        end = bisect_right(self._entries, (key, chr(0x10ffff)))
+        return {id for _, id in self._entries[start:end]}
+
+    def range(self, low=None, high=None):
+        """
+        Page ids with low <= value <= high, in value order; a missing bound is open
+        """
+        start = 0 if low is None else bisect_left(self._entries, (self.bound(low),))
+        end = len(self._entries) if high is None else bisect_right(self._entries, (self.bound(high), chr(0x10ffff)))
+        return [id for _, id in self._entries[start:end]]
+
+
+class RowIndex:
+    """
+    Decoded rows of a database held in memory, with secondary indexes on chosen properties.
+    Rows are replaced as a whole so every index stays consistent with `rows`.
+    """
+
+    def __init__(self):
+        self.rows = {}
+        self.indexes = {}
+        self.watermark = None
+        self._lock = threading.RLock()
+
+    def add_index(self, index):
+        with self._lock:
+            for id, row in self.rows.items():
+                index.add(id, row)
+            self.indexes[index.name] = index
+
+    def put(self, row: dict):
+        id = row['_id']
+        with self._lock:
+            if row.get('_archived'):
+                self.discard(id)
+                return
+            old = self.rows.get(id)
+            for index in self.indexes.values():
+                if old is not None:
+                    index.remove(id, old)
+                index.add(id, row)
+            self.rows[id] = row
+
+    def discard(self, id: str):
+        with self._lock:
+            old = self.rows.pop(id, None)
+            if old is not None:
+                for index in self.indexes.values():
+                    index.remove(id, old)
+
+    def clear(self):
+        with self._lock:
+            self.rows.clear()
+            self.watermark = None
+            for name, index in list(self.indexes.items()):
+                self.indexes[name] = type(index)(name)
+
+    def index(self, name: str):
+        index = self.indexes.get(name)
+        if index is None:
+            raise KeyError(f'No index on {name!r}, see NotionDatabase.create_index')
+        return index
+
+    def find(self, name: str, value):
+        with self._lock:
+            return [self.rows[id] for id in self.index(name).get(value)]
+
+    def range(self, name: str, low=None, high=None):
+        with self._lock:
+            index = self.index(name)
+            if not isinstance(index, SortedIndex):
+                raise TypeError(f'Index on {name!r} is not sorted')
+            return [self.rows[id] for id in index.range(low, high)]
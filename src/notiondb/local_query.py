@@ -0,0 +1,314 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, List
+import json
+import operator
+
+
+"""
+Value normalizers: decoded rows (find, QueryCache) and SQLiteMirror rows hold the same
+property in different shapes, e.g. a select as {'name': ...} or as its name
+"""
+def to_text(value):
+    return '' if value is None else str(value)
+
+
+def to_name(value):
+    if isinstance(value, dict):
+        return value.get('name')
+    return value
+
+
+def to_list(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return [value]
+    return [item.get('name', item.get('id')) if isinstance(item, dict) else item for item in value]
+
+
+def to_id(value):
+    return value.replace('-', '') if isinstance(value, str) else value
+
+
+def to_datetime(value):
+    """
+    Naive UTC datetime of a date value, timestamp, ISO string or {'start': ...} dict
+    """
+    if isinstance(value, dict):
+        value = value.get('start')
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, date):
+        dt = datetime(value.year, value.month, value.day)
+    elif not isinstance(value, str):
+        return None
+    else:
+        try:
+            dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def to_date(value):
+    dt = to_datetime(value)
+    return dt.date() if dt is not None else None
+
+
+def is_date_only(value):
+    return isinstance(value, str) and len(value) == 10
+
+
+def now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def comparable(type: str, value):
+    """
+    Value of a property of type `type` reduced to what a write can change, so a decoded row
+    value and the plain value written to it compare equal, e.g. {'name': 'Fruit'} and 'Fruit'
+    """
+    if type in ('title', 'rich_text', 'text', 'url', 'email', 'phone_number'):
+        return to_text(value)
+    if type in ('select', 'status'):
+        return to_name(value)
+    if type in ('multi_select', 'people'):
+        return sorted(to_list(value))
+    if type == 'relation':
+        return sorted(to_id(id) for id in to_list(value))
+    if type == 'date':
+        return to_datetime(value)
+    if type == 'checkbox':
+        return bool(value)
+    return value
+
+
+"""
+Conditions, per filter type: operator -> test(row value, filter value)
+"""
+def _contains(value, target):
+    return target.lower() in value.lower()
+
+
+TEXT_CONDITIONS = {
+    'equals': lambda value, target: value == target,
+    'does_not_equal': lambda value, target: value != target,
+    'contains': _contains,
+    'does_not_contain': lambda value, target: not _contains(value, target),
+    'starts_with': lambda value, target: value.lower().startswith(target.lower()),
+    'ends_with': lambda value, target: value.lower().endswith(target.lower()),
+    'is_empty': lambda value, _: value == '',
+    'is_not_empty': lambda value, _: value != '',
+}
+
+
+def _compare(op):
+    return lambda value, target: value is not None and op(value, target)
+
+
+NUMBER_CONDITIONS = {
+    'equals': _compare(operator.eq),
+    'does_not_equal': lambda value, target: value != target,
+    'greater_than': _compare(operator.gt),
+    'less_than': _compare(operator.lt),
+    'greater_than_or_equal_to': _compare(operator.ge),
+    'less_than_or_equal_to': _compare(operator.le),
+    'is_empty': lambda value, _: value is None,
+    'is_not_empty': lambda value, _: value is not None,
+}
+
+CHECKBOX_CONDITIONS = {
+    'equals': lambda value, target: bool(value) == target,
+    'does_not_equal': lambda value, target: bool(value) != target,
+}
+
+SELECT_CONDITIONS = {
+    'equals': lambda value, target: value == target,
+    'does_not_equal': lambda value, target: value != target,
+    'is_empty': lambda value, _: not value,
+    'is_not_empty': lambda value, _: bool(value),
+}
+
+LIST_CONDITIONS = {
+    'contains': lambda value, target: target in value,
+    'does_not_contain': lambda value, target: target not in value,
+    'is_empty': lambda value, _: not value,
+    'is_not_empty': lambda value, _: bool(value),
+}
+
+
+def _relative(days: int):
+    def test(value, _):
+        if value is None:
+            return False
+        start, end = sorted((now(), now() + timedelta(days=days)))
+        return start <= value <= end
+    return test
+
+
+DATE_CONDITIONS = {
+    'equals': _compare(operator.eq),
+    'before': _compare(operator.lt),
+    'after': _compare(operator.gt),
+    'on_or_before': _compare(operator.le),
+    'on_or_after': _compare(operator.ge),
+    'is_empty': lambda value, _: value is None,
+    'is_not_empty': lambda value, _: value is not None,
+    'past_week': _relative(-7),
+    'past_month': _relative(-31),
+    'past_year': _relative(-365),
+    'next_week': _relative(7),
+    'next_month': _relative(31),
+    'next_year': _relative(365),
+}
+
+
+# Filter type -> (value normalizer, conditions, filter value normalizer)
+FILTER_TYPES = {
+    'title': (to_text, TEXT_CONDITIONS, None),
+    'rich_text': (to_text, TEXT_CONDITIONS, None),
+    'text': (to_text, TEXT_CONDITIONS, None),
+    'url': (to_text, TEXT_CONDITIONS, None),
+    'email': (to_text, TEXT_CONDITIONS, None),
+    'phone_number': (to_text, TEXT_CONDITIONS, None),
+    'number': (None, NUMBER_CONDITIONS, None),
+    'checkbox': (None, CHECKBOX_CONDITIONS, None),
+    'select': (to_name, SELECT_CONDITIONS, None),
+    'status': (to_name, SELECT_CONDITIONS, None),
+    'multi_select': (to_list, LIST_CONDITIONS, None),
+    'relation': (lambda value: [to_id(id) for id in to_list(value)], LIST_CONDITIONS, to_id),
+    'people': (to_list, LIST_CONDITIONS, None),
+    'date': (to_datetime, DATE_CONDITIONS, to_datetime),
+    'created_time': (to_datetime, DATE_CONDITIONS, to_datetime),
+    'last_edited_time': (to_datetime, DATE_CONDITIONS, to_datetime),
+}
+
+
+def _getter(filter: dict):
+    if 'timestamp' in filter:
+        # Page timestamps, as kept by SQLiteMirror rows
+        key = '_' + filter['timestamp']
+        return lambda row: row.get(key)
+    name = filter['property']
+    return lambda row: row.get(name)
+
+
+def _compile_condition(type: str, condition: dict, get):
+    if type not in FILTER_TYPES:
+        raise ValueError(f'Unsupported filter type: {type}')
+    normalize, conditions, normalize_target = FILTER_TYPES[type]
+    if len(condition) != 1:
+        raise ValueError(f'Expected one condition, got {condition}')
+    (name, target), = condition.items()
+    if name not in conditions:
+        raise ValueError(f'Unsupported {type} condition: {name}')
+    test = conditions[name]
+
+    if normalize is to_datetime and is_date_only(target):
+        # A date without time compares with the day of the row's value
+        normalize = to_date
+        normalize_target = to_date
+
+    if normalize_target is not None:
+        target = normalize_target(target)
+    if normalize is None:
+        return lambda row: test(get(row), target)
+    return lambda row: test(normalize(get(row)), target)
+
+
+def compile_filter(filter: dict = None):
+    """
+    Compile a Notion filter object (as passed to query_database) into a predicate over rows
+    """
+    if not filter:
+        return lambda row: True
+    if 'and' in filter:
+        predicates = [compile_filter(item) for item in filter['and']]
+        return lambda row: all(predicate(row) for predicate in predicates)
+    if 'or' in filter:
+        predicates = [compile_filter(item) for item in filter['or']]
+        return lambda row: any(predicate(row) for predicate in predicates)
+
+    get = _getter(filter)
+    types = [key for key in filter if key not in ('property', 'timestamp', 'type')]
+    if len(types) != 1:
+        raise ValueError(f'Invalid filter: {filter}')
+    type = types[0]
+
+    if type in ('formula', 'rollup'):
+        # Nested condition on the computed value, e.g. {'formula': {'number': {...}}}
+        (type, condition), = filter[type].items()
+        if type in ('any', 'every', 'none'):
+            raise ValueError(f'Unsupported {types[0]} condition: {type}')
+        return _compile_condition(type, condition, get)
+    return _compile_condition(type, filter[type], get)
+
+
+def _sort_value(value):
+    if isinstance(value, dict):
+        return to_name(value) if 'name' in value else to_datetime(value)
+    if isinstance(value, list):
+        return tuple(to_list(value))
+    return value
+
+
+def _is_empty(value):
+    return value is None or value == '' or value == [] or value == ()
+
+
+def compile_sorts(sorts: List[dict] = None):
+    """
+    Compile Notion sorts into a function sorting a list of rows in place.
+    Empty values come last in both directions, like in Notion.
+    """
+    terms = []
+    for sort in sorts or []:
+        key = '_' + sort['timestamp'] if 'timestamp' in sort else sort['property']
+        terms.append((key, sort.get('direction', 'ascending') == 'descending'))
+
+    def sort_rows(rows: list):
+        # Stable sorts from the last term to the first
+        for key, descending in reversed(terms):
+            values = [(_sort_value(row.get(key)), row) for row in rows]
+            filled = [item for item in values if not _is_empty(item[0])]
+            empty = [row for value, row in values if _is_empty(value)]
+            filled.sort(key=operator.itemgetter(0), reverse=descending)
+            rows[:] = [row for _, row in filled] + empty
+        return rows
+
+    return sort_rows
+
+
+class LocalQuery:
+    """
+    Notion filter and sorts compiled once and evaluated over rows held locally, e.g. the rows
+    of database.find(), a QueryCache result or SQLiteMirror.rows():
+
+        query = LocalQuery(filter=filter, sorts=sorts)
+        rows = query.run(rows, limit=10)
+
+    Text conditions other than equals are case-insensitive; selects sort by option name
+    rather than by their order in the schema.
+    """
+
+    def __init__(self, filter: dict = None, sorts: List[dict] = None):
+        self.filter = filter
+        self.sorts = sorts
+        self.predicate = compile_filter(filter)
+        self.sort = compile_sorts(sorts)
+
+    def run(self, rows: Iterable[dict], limit: int = None):
+        rows = [row for row in rows if self.predicate(row)]
+        if self.sorts:
+            self.sort(rows)
+        return rows if limit is None else rows[:limit]
+
+    def __call__(self, rows: Iterable[dict], limit: int = None):
+        return self.run(rows, limit=limit)
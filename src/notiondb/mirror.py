@@ -0,0 +1,181 @@
+from .database import NotionDatabase
+from .decoder import decode_rich_text
+from datetime import datetime, timezone
+import json
+import sqlite3
+
+
+SQL_TYPES = {
+    'number': 'REAL',
+    'checkbox': 'INTEGER',
+}
+
+
+def column_value(prop: dict):
+    """
+    SQLite value of a raw page property: text for text, dates (start) and select names,
+    JSON for lists and other structured values
+    """
+    type = prop.get('type')
+    value = prop.get(type)
+    if value is None:
+        return None
+    if type in ('title', 'rich_text', 'text'):
+        return decode_rich_text(value)
+    if type == 'checkbox':
+        return int(value)
+    if type in ('select', 'status'):
+        return value.get('name')
+    if type == 'multi_select':
+        return json.dumps([option.get('name') for option in value], ensure_ascii=False)
+    if type == 'relation':
+        return json.dumps([item.get('id') for item in value])
+    if type == 'date':
+        return value.get('start')
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def quote(name: str):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SQLiteMirror:
+    """
+    Local SQLite copy of a Notion database, kept up to date incrementally.
+
+    The table has one column per database property plus `_id`, `_created_time` and
+    `_last_edited_time`. Each sync only queries the pages edited since the last one, using
+    the last_edited_time watermark stored in the `_notiondb_sync` table. Notion rounds
+    last_edited_time to the minute, so pages of the watermark's minute are pulled again.
+
+    Archived pages are deleted from the table when they show up in a sync. The query
+    endpoint doesn't return archived pages, so pages archived elsewhere are only removed
+    by a full sync, which pulls every page and deletes the rows it didn't see.
+    """
+
+    SYNC_TABLE = '_notiondb_sync'
+
+    def __init__(self, database: NotionDatabase, path: str, table: str = None):
+        self.database = database
+        self.table = table or 'notion_' + database.id.replace('-', '')
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(f'CREATE TABLE IF NOT EXISTS {self.SYNC_TABLE} (name TEXT PRIMARY KEY, database_id TEXT, watermark TEXT, synced_at TEXT)')
+        self.connection.commit()
+        self.columns = {}  # property name -> property type
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def watermark(self):
+        row = self.connection.execute(f'SELECT watermark FROM {self.SYNC_TABLE} WHERE name = ?', (self.table,)).fetchone()
+        return row[0] if row else None
+
+    def _save_watermark(self, watermark: str):
+        synced_at = datetime.now(timezone.utc).isoformat()
+        self.connection.execute(
+            f'INSERT OR REPLACE INTO {self.SYNC_TABLE} (name, database_id, watermark, synced_at) VALUES (?, ?, ?, ?)',
+            (self.table, self.database.id, watermark, synced_at),
+        )
+
+    def _create_table(self, schema: dict):
+        """
+        Create the table from the database schema, adding the columns of new properties
+        """
+        self.columns = {name: prop.get('type') for name, prop in schema.items()}
+        columns = ['_id TEXT PRIMARY KEY', '_created_time TEXT', '_last_edited_time TEXT']
+        columns += [f'{quote(name)} {SQL_TYPES.get(type, "TEXT")}' for name, type in self.columns.items()]
+        self.connection.execute(f'CREATE TABLE IF NOT EXISTS {quote(self.table)} ({", ".join(columns)})')
+
+        existing = {row[1] for row in self.connection.execute(f'PRAGMA table_info({quote(self.table)})')}
+        for name, type in self.columns.items():
+            if name not in existing:
+                self.connection.execute(f'ALTER TABLE {quote(self.table)} ADD COLUMN {quote(name)} {SQL_TYPES.get(type, "TEXT")}')
+        self.connection.execute(f'CREATE INDEX IF NOT EXISTS {quote(self.table + "_last_edited_time")} ON {quote(self.table)} (_last_edited_time)')
+
+    def _write(self, rows: list):
+        names = list(self.columns)
+        upserts = []
+        deletes = []
+        for row in rows:
+            if row.get('archived'):
+                deletes.append((row.get('id'),))
+                continue
+            properties = row.get('properties', {})
+            values = [row.get('id'), row.get('created_time'), row.get('last_edited_time')]
+            values += [column_value(properties[name]) if name in properties else None for name in names]
+            upserts.append(values)
+
+        columns = ['_id', '_created_time', '_last_edited_time'] + [quote(name) for name in names]
+        if upserts:
+            self.connection.executemany(
+                f'INSERT OR REPLACE INTO {quote(self.table)} ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})',
+                upserts,
+            )
+        if deletes:
+            self.connection.executemany(f'DELETE FROM {quote(self.table)} WHERE _id = ?', deletes)
+        return len(upserts), len(deletes)
+
+    def sync(self, full: bool = False):
+        """
+        Pull the pages edited since the last sync (every page with `full`) into the table.
+        Each result page is committed with the watermark reached so far, so an interrupted
+        sync resumes where it stopped. Returns counts of upserted and deleted rows.
+        """
+        info = self.database.info()
+        self._create_table((info or {}).get('properties') or {})
+        self.connection.commit()
+
+        watermark = None if full else self.watermark
+        filter = self.database.edited_since(watermark) if watermark else None
+        sorts = [{'timestamp': 'last_edited_time', 'direction': 'ascending'}]
+
+        stats = {'upserted': 0, 'deleted': 0}
+        seen = set()
+        for rows in self.database._iter_pages(filter=filter, sorts=sorts):
+            self.database.complete_properties(rows)
+            upserted, deleted = self._write(rows)
+            stats['upserted'] += upserted
+            stats['deleted'] += deleted
+            for row in rows:
+                seen.add(row.get('id'))
+                edited = row.get('last_edited_time')
+                if edited and (watermark is None or edited > watermark):
+                    watermark = edited
+            if watermark:
+                self._save_watermark(watermark)
+            self.connection.commit()
+
+        if full:
+            stats['deleted'] += self._delete_missing(seen)
+            self.connection.commit()
+
+        stats['watermark'] = watermark
+        return stats
+
+    def _delete_missing(self, seen: set):
+        ids = [row[0] for row in self.connection.execute(f'SELECT _id FROM {quote(self.table)}') if row[0] not in seen]
+        self.connection.executemany(f'DELETE FROM {quote(self.table)} WHERE _id = ?', [(id,) for id in ids])
+        return len(ids)
+
+    def query(self, sql: str, params: tuple = ()):
+        """
+        Run a read query on the mirror, e.g. mirror.query(f'SELECT ... FROM {mirror.table} ...')
+        """
+        return self.connection.execute(sql, params).fetchall()
+
+    def rows(self):
+        """
+        Every row of the mirror as a dict of column -> value, e.g. for LocalQuery
+        """
+        cursor = self.connection.execute(f'SELECT * FROM {quote(self.table)}')
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
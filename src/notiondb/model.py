@@ -2,45 +2,105 @@
 from .fields import BaseField
 from .query_set import QuerySet
 from .database import NotionDatabase
+from .identity_map import current_identity_map
 from .block import BaseBlock
 from typing import List
 
 
-class NotionModel:
+class NotionModelMeta(type):
+    """
+    Collects the fields declared on the class body into an ordered registry:
+
+        class Product(NotionModel):
+            name = TitleField('Name')
+            price = NumberField('Price')
+
+    Every instance gets its own copy of the declared fields, stored in `__slots__`
+    unless the class defines its own `__init__` (which may set other attributes).
+    """
+
+    def __new__(mcs, name, bases, namespace):
+        declared = [(attr, value) for attr, value in namespace.items() if isinstance(value, BaseField)]
+        for attr, _ in declared:
+            del namespace[attr]
+
+        registry = {}
+        for base in reversed(bases):
+            registry.update(getattr(base, '_declared_fields', {}))
+        registry.update(declared)
+
+        if declared and '__slots__' not in namespace and '__init__' not in namespace:
+            inherited = set()
+            for base in bases:
+                for klass in base.__mro__:
+                    inherited.update(getattr(klass, '__slots__', ()))
+            namespace['__slots__'] = tuple(attr for attr, _ in declared if attr not in inherited)
+
+        cls = super().__new__(mcs, name, bases, namespace)
+        cls._declared_fields = registry
+        return cls
+
+
+class NotionModel(metaclass=NotionModelMeta):
+
+    __slots__ = ('database', 'id', '__weakref__')
 
     def __init__(self, database: NotionDatabase = None, id: str = None):
         self.database = database
         self.id = id
 
+        for attr, field in self._declared_fields.items():
+            setattr(self, attr, field.copy())
+
     @classmethod
     def objects(cls, database: NotionDatabase):
         return QuerySet(cls, database)
 
+    def _field_attrs(self):
+        # Resolved once per class: declared fields, then fields assigned in __init__
+        cls = type(self)
+        attrs = cls.__dict__.get('_field_attrs_cache')
+        if attrs is None:
+            assigned = [attr for attr, value in getattr(self, '__dict__', {}).items() if isinstance(value, BaseField) and attr not in cls._declared_fields]
+            attrs = tuple(cls._declared_fields) + tuple(assigned)
+            cls._field_attrs_cache = attrs
+            cls._hydration_plan = tuple((attr, getattr(self, attr).name) for attr in attrs)
+        return attrs
+
     @property
     def fields(self):
-        attrs = dir(self)
-        attrs = filter(lambda attr: '__' not in attr and attr not in ['fields'], attrs)
-        attrs = filter(lambda attr: isinstance(getattr(self, attr), BaseField), attrs)
-        fields: List[BaseField] = [getattr(self, attr) for attr in attrs]
+        fields: List[BaseField] = [getattr(self, attr) for attr in self._field_attrs()]
         return fields
 
+    def hydrate(self, data: dict):
+        """
+        Set field values from a parsed row in one pass over the class' precompiled plan
+        """
+        self._field_attrs()
+        for attr, name in type(self)._hydration_plan:
+            if name in data:
+                getattr(self, attr).set_value(data[name])
+        return self
+
     @classmethod
     def from_id(cls, database: NotionDatabase, id: str):
-        data = database.find_one(id)
-        model = cls(database, id)
-        for field in model.fields:
-            if field.name in data:
-                field.set_value(data[field.name])
-        return model
+        load = lambda: cls(database, id).hydrate(database.find_one(id))
+
+        # Inside an IdentityMap, the same id gives back the same model instance
+        identity_map = current_identity_map()
+        if identity_map is not None:
+            return identity_map.get_model(cls, id, load)
+        return load()
+
+    @classmethod
+    async def afrom_id(cls, database: NotionDatabase, id: str):
+        data = await database.afind_one(id)
+        return cls(database, id).hydrate(data)
 
     @classmethod
     def from_data(cls, database: NotionDatabase, data: dict):
         id = data.get('_id')
-        model = cls(database, id)
-        for field in model.fields:
-            if field.name in data:
-                field.set_value(data[field.name])
-        return model
+        return cls(database, id).hydrate(data)
 
     def get_children(self):
         if not self.id:
@@ -67,12 +127,21 @@ class NotionModel:
             data[field.name] = field.value
         return data
 
-    def save(self):
+    def get_update_props(self, fields: List[BaseField] = None):
         props = {}
-        for field in self.fields:
+        for field in fields or self.fields:
             update_prop = field.update_prop
             if update_prop is not None:
                 props.update(update_prop)
+        return props
+
+    def reset_updated(self, fields: List[BaseField] = None):
+        for field in fields or self.fields:
+            field._updated = False
+
+    def save(self):
+        fields = self.fields
+        props = self.get_update_props(fields)
 
         if props == {}:
             return None
@@ -82,16 +151,44 @@ class NotionModel:
             response = self.database.insert_one(props)
 
             self.id = response['_id']
+        # queued, written by the database's write-behind worker
+        elif self.database.write_behind is not None:
+            self.database.write_behind.enqueue(self.id, props)
+            response = None
         # update
         else:
             response = self.database.update_one(self.id, props)
 
         # Reset updated status
-        for field in self.fields:
-            field._updated = False
+        self.reset_updated(fields)
         
         return response
 
+    async def asave(self):
+        fields = self.fields
+        props = self.get_update_props(fields)
+
+        if props == {}:
+            return None
+
+        if not self.id:
+            response = await self.database.ainsert_one(props)
+
+            self.id = response['_id']
+        elif self.database.write_behind is not None:
+            self.database.write_behind.enqueue(self.id, props)
+            response = None
+        else:
+            response = await self.database.aupdate_one(self.id, props)
+
+        self.reset_updated(fields)
+
+        return response
+
     def delete(self):
         response = self.database.delete_one(self.id)
         return response
+
+    async def adelete(self):
+        response = await self.database.adelete_one(self.id)
+        return response
@@ -0,0 +1,103 @@
+from .decoder import decode_time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+import json
+import threading
+import time
+
+
+class QueryCache:
+    """
+    Cache of NotionDatabase.find results keyed on (database id, filter, sorts, projection, limit).
+
+    Before reusing a result, one cheap probe queries the most recently edited page of the
+    database (page_size=1, sorted by last_edited_time). The result is reused when that page
+    is still the one seen when the result was fetched, and the result was fetched at least
+    a minute after its last edit: Notion rounds last_edited_time to the minute, so later
+    edits within the same minute would go unnoticed.
+
+    Archived pages leave the query results without changing the probe, so archives made
+    through the database clear its cached results; use `max_age` to bound the staleness
+    left by archives made elsewhere.
+    """
+
+    PROBE_SORTS = [{'timestamp': 'last_edited_time', 'direction': 'descending'}]
+
+    # Resolution of last_edited_time
+    RESOLUTION = timedelta(minutes=1)
+
+    def __init__(self, max_entries: int = 128, max_age: float = None):
+        self.max_entries = max_entries
+        self.max_age = max_age
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (database id, watermark, fetched at, monotonic time, rows json)
+
+        self.hits = 0
+        self.misses = 0
+        self.probes = 0
+
+    @staticmethod
+    def key(database_id: str, filter: dict = None, sorts: list = None, filter_properties: list = None, limit: int = None):
+        return json.dumps([database_id, filter, sorts, sorted(filter_properties or []), limit], sort_keys=True)
+
+    @staticmethod
+    def now():
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+
+    def probe(self, api, database_id: str):
+        """
+        (id, last_edited_time) of the most recently edited page of the database
+        """
+        with self._lock:
+            self.probes += 1
+        rows, _ = api.query_database(database_id, sorts=self.PROBE_SORTS, page_size=1, raise_errors=True)
+        if not rows:
+            return None, None
+        return rows[0].get('id'), rows[0].get('last_edited_time')
+
+    def is_fresh(self, entry, watermark):
+        _, cached_watermark, fetched_at, cached_at, _ = entry
+        if self.max_age is not None and time.monotonic() - cached_at > self.max_age:
+            return False
+        if watermark != cached_watermark:
+            return False
+        edited = decode_time(watermark[1]) if watermark[1] else None
+        return edited is None or fetched_at >= edited + self.RESOLUTION
+
+    def get(self, key, watermark):
+        """
+        Cached raw rows of `key`, as new objects, when still fresh at `watermark`
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not self.is_fresh(entry, watermark):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            rows = entry[4]
+        return json.loads(rows)
+
+    def set(self, key, database_id: str, watermark, fetched_at: datetime, rows: list):
+        rows = json.dumps(rows)
+        with self._lock:
+            self._entries[key] = (database_id, watermark, fetched_at, time.monotonic(), rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, database_id: str = None):
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if database_id is None or entry[0] == database_id]:
+                del self._entries[key]
+
+    @property
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'probes': self.probes,
+                'entries': len(self._entries),
+            }
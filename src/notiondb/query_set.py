@@ -1,17 +1,110 @@
 
+from .concurrency import run_concurrently
 from .database import NotionDatabase
+from .fields import BaseField
+from itertools import islice
 from typing import List
+import copy
 
 
 class QuerySet:
 
-    def __init__(self, model_cls, database: NotionDatabase):
+    def __init__(self, model_cls, database: NotionDatabase, only: List[str] = None):
         self.model_cls = model_cls
         self.database = database
+        self._only = only
+        self._prefetch = []
+
+    def _clone(self, **kwargs):
+        query_set = copy.copy(self)
+        query_set.__dict__.update(kwargs)
+        return query_set
+
+    def only(self, *fields: str):
+        """
+        Only download and decode the given fields, by model attribute or property name: qs.only('name', 'price')
+        """
+        model = self.model_cls(self.database)
+        names = []
+        for field in fields:
+            attr = getattr(model, field, None)
+            names.append(attr.name if isinstance(attr, BaseField) else field)
+        return self._clone(_only=names)
+
+    def prefetch_related(self, field: str, model, database: NotionDatabase = None, concurrency: int = None):
+        """
+        Attach the related models of a RelationField (by attribute name) to `field.related`:
+
+            for order in Order.objects(db).prefetch_related('customer', model=Customer).get():
+                order.customer.related  # [Customer, ...]
+
+        Distinct related ids of each page of results are fetched once, concurrently,
+        and reused for the rest of the query. A failed fetch raises; pages not found
+        (e.g. deleted) are left out of `related`.
+        """
+        prefetch = self._prefetch + [(field, model, database or self.database, concurrency)]
+        return self._clone(_prefetch=prefetch)
+
+    def _fetch_related(self, models: list, cache: dict):
+        for field, model_cls, database, concurrency in self._prefetch:
+            fields = [getattr(model, field) for model in models]
+            ids = {id for relation in fields for id in relation.value or [] if id not in cache}
+
+            fetch = lambda id: database.find_one(id)
+            for result in run_concurrently(fetch, ids, concurrency=concurrency or database.DEFAULT_CONCURRENCY):
+                if not result.ok:
+                    raise result.error
+                if result.result:
+                    cache[result.input] = model_cls.from_data(database, result.result)
+
+            for relation in fields:
+                relation.related = [cache[id] for id in relation.value or [] if id in cache]
 
     def get(self, filter: dict = None, sorts: List[dict] = None, limit: int = None):
-        cnt = 0
-        for item in self.database.find(filter, sorts):
-            if limit is None or cnt < limit:
-                yield self.model_cls.from_data(self.database, item)
-                cnt += 1
+        # limit is pushed down as page_size and stops the pagination.
+        # Lazy rows only decode the properties the model has fields for
+        models = (self.model_cls.from_data(self.database, item) for item in self.database.find(filter, sorts, limit=limit, lazy=True, only=self._only))
+        if not self._prefetch:
+            yield from models
+            return
+
+        cache = {}
+        while True:
+            page = list(islice(models, self.database.MAX_PAGE_SIZE))
+            if not page:
+                return
+            self._fetch_related(page, cache)
+            yield from page
+
+    def first(self, filter: dict = None, sorts: List[dict] = None):
+        for model in self.get(filter, sorts, limit=1):
+            return model
+        return None
+
+    def exists(self, filter: dict = None):
+        # One query: no query cache probe nor completion of truncated values
+        for _ in self.database.find(filter, limit=1, prefetch=0, complete=False):
+            return True
+        return False
+
+    def update(self, filter: dict, concurrency: int = None, **values):
+        """
+        Set model fields, by attribute name, on every row matching `filter`: qs.update(filter, price=2.5).
+        An empty filter {} updates every row.
+        """
+        model = self.model_cls(self.database)
+        for attr, value in values.items():
+            getattr(model, attr).value = value
+        properties = model.get_update_props()
+
+        return list(self.database.update_many(filter, properties, concurrency=concurrency))
+
+    def delete(self, filter: dict, concurrency: int = None):
+        """
+        Archive every row matching `filter`; an empty filter {} archives every row
+        """
+        return list(self.database.archive_many(filter, concurrency=concurrency))
+
+    async def aget(self, filter: dict = None, sorts: List[dict] = None, limit: int = None):
+        async for item in self.database.afind(filter, sorts, limit=limit, only=self._only):
+            yield self.model_cls.from_data(self.database, item)
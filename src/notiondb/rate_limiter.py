@@ -0,0 +1,85 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every thread using one client.
+
+    Callers reserve a token and sleep until it is due instead of being rejected,
+    so requests are queued in arrival order at `rate` requests per second.
+    """
+
+    def __init__(self, rate: float = 3, burst: int = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        self._requests = 0
+        self._delayed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _refill(self, now: float):
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def reserve(self):
+        """
+        Take a token and return how many seconds the caller has to wait before sending
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+
+            wait = max(0.0, self._updated - now)
+            if self._tokens < 0:
+                wait += -self._tokens / self.rate
+
+            self._requests += 1
+            if wait > 0:
+                self._delayed += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            return wait
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float):
+        """
+        Stop handing out tokens for `seconds`, e.g. after a 429 with Retry-After
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            until = now + seconds
+            if until > self._updated:
+                self._tokens = min(self._tokens, 0.0)
+                self._updated = until
+
+    @property
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self._requests,
+                'delayed': self._delayed,
+                'total_wait': self._total_wait,
+                'max_wait': self._max_wait,
+                'avg_wait': self._total_wait / self._requests if self._requests else 0.0,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._requests = 0
+            self._delayed = 0
+            self._total_wait = 0.0
+            self._max_wait = 0.0
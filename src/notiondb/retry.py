@@ -0,0 +1,42 @@
+from .exceptions import NotionTransientError
+import random
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff for transient failures.
+
+    Idempotent requests (GET, PATCH, DELETE and read-only POSTs such as queries)
+    are retried on transient statuses, timeouts and dropped connections.
+    Other POSTs, and requests marked idempotent=False such as appending block
+    children, are only retried when the request never reached Notion, so a retry
+    can't create a page or append blocks twice.
+    """
+
+    IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PATCH', 'PUT', 'DELETE')
+
+    def __init__(self, max_retries: int = 5, backoff: float = 0.5, max_backoff: float = 30, statuses=NotionTransientError.STATUSES):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = statuses
+
+    def is_idempotent(self, method: str, idempotent: bool = None):
+        if idempotent is not None:
+            return idempotent
+        return method.upper() in self.IDEMPOTENT_METHODS
+
+    def should_retry_status(self, attempt: int, status: int, idempotent: bool):
+        return idempotent and attempt < self.max_retries and status in self.statuses
+
+    def should_retry_error(self, attempt: int, idempotent: bool, sent: bool = True):
+        """
+        Timeouts and dropped connections; `sent` is False when the request never left the client
+        """
+        if attempt >= self.max_retries:
+            return False
+        return idempotent or not sent
+
+    def delay(self, attempt: int):
+        # Full jitter: uniform in [0, min(max_backoff, backoff * 2^attempt)]
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
@@ -0,0 +1,79 @@
+from .concurrency import run_concurrently
+from .identity_map import IdentityMap
+
+
+class Session(IdentityMap):
+    """
+    Unit of work: models loaded inside the session (NotionModel.from_id) and models added
+    with `add` are tracked, and `commit` saves every dirty one concurrently.
+
+        with Session() as session:
+            product = Product.from_id(database, id)
+            product.price.value = 3
+            session.add(Product(database))  # new row
+            results = session.commit()
+
+    New models get their page id once created. Models whose save failed keep their
+    changes, so a later commit sends them again.
+    """
+
+    DEFAULT_CONCURRENCY = 8
+
+    def __init__(self, concurrency: int = None):
+        super().__init__()
+        self.concurrency = concurrency or self.DEFAULT_CONCURRENCY
+        self._added = []
+
+    def add(self, model):
+        self._added.append(model)
+        return model
+
+    def add_all(self, models):
+        for model in models:
+            self.add(model)
+
+    @property
+    def tracked(self):
+        models = {id(model): model for model in self._added}
+        models.update((id(model), model) for model in self.models.values() if model is not None)
+        return list(models.values())
+
+    @property
+    def dirty(self):
+        return [model for model in self.tracked if not model.id or any(field.is_updated for field in model.fields)]
+
+    def _save(self, job):
+        model, fields, props = job
+        database = model.database
+        if not model.id:
+            item = database.api.create_page('database_id', database.id, properties=props, raise_errors=True)
+        else:
+            item = database.api.update_page(model.id, properties=props, raise_errors=True)
+        row = database._updated(database._parse_properties(item))
+        model.reset_updated(fields)
+        return row
+
+    def commit(self, ordered: bool = True):
+        """
+        Save every dirty model, with up to `concurrency` requests in flight.
+        Returns a BulkResult per saved model: `input` is the model, `result` its parsed row.
+        """
+        jobs = []
+        for model in self.dirty:
+            # Fields are resolved once per model for both the payload and the reset
+            fields = model.fields
+            props = model.get_update_props(fields)
+            if props:
+                jobs.append((model, fields, props))
+
+        results = []
+        for result in run_concurrently(self._save, jobs, concurrency=self.concurrency, ordered=ordered):
+            model = result.input[0]
+            if result.ok and not model.id:
+                model.id = result.result['_id']
+                with self._lock:
+                    self.models.setdefault((type(model), model.id), model)
+            results.append(result._replace(input=model))
+
+        self._added = [model for model in self._added if not model.id]
+        return results
@@ -0,0 +1,166 @@
+from .concurrency import run_concurrently
+from .exceptions import NotionTransientError
+import atexit
+import json
+import os
+import threading
+
+
+class WriteBehindQueue:
+    """
+    Queue of page updates flushed in the background: updates of the same page made within
+    a flush window are merged into one PATCH (later values win), and pages are written
+    concurrently, within the client's rate limit.
+
+    With a `journal` path, every update is appended to a JSON-lines file before it is
+    queued, replayed when the queue starts and compacted after each flush, so queued
+    writes survive a crash. Without a journal, what is still queued is written when the
+    interpreter exits normally (atexit) but lost if the process is killed.
+
+    Updates failing with a transient error stay queued; other failures are dropped and
+    kept in `failed`. Errors of the worker itself (e.g. journal IO) keep the batch queued
+    and are kept in `errors`.
+    """
+
+    def __init__(self, database, flush_interval: float = 1.0, journal: str = None, concurrency: int = None):
+        self.database = database
+        self.flush_interval = flush_interval
+        self.journal = journal
+        self.concurrency = concurrency or database.DEFAULT_CONCURRENCY
+
+        self._pending = {}  # page id -> merged properties
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._journal_file = None
+
+        self.failed = []
+        self.errors = []
+        self.stats = {'enqueued': 0, 'merged': 0, 'written': 0, 'failed': 0}
+
+        if journal:
+            self._replay()
+            self._journal_file = open(journal, 'a', encoding='utf-8')
+
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def _replay(self):
+        if not os.path.exists(self.journal):
+            return
+        with open(self.journal, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Last line cut by a crash
+                    continue
+                self._merge(entry['id'], entry['properties'])
+
+    def _merge(self, id: str, properties: dict):
+        pending = self._pending.get(id)
+        if pending is None:
+            self._pending[id] = dict(properties)
+        else:
+            pending.update(properties)
+            self.stats['merged'] += 1
+
+    def enqueue(self, id: str, properties: dict):
+        with self._lock:
+            if self._journal_file is not None:
+                self._journal_file.write(json.dumps({'id': id, 'properties': properties}, ensure_ascii=False) + '\n')
+                self._journal_file.flush()
+            self._merge(id, properties)
+            self.stats['enqueued'] += 1
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _requeue(self, id: str, properties: dict):
+        # Called with the lock held: updates queued since are newer and win
+        self._pending[id] = dict(properties, **self._pending.get(id, {}))
+
+    def flush(self):
+        """
+        Write every queued update now; returns a BulkResult per page written
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return []
+
+            def update(item):
+                id, properties = item
+                page = self.database.api.update_page(id, properties=properties, raise_errors=True)
+                return self.database._updated(self.database._parse_properties(page))
+
+            try:
+                results = list(run_concurrently(update, batch.items(), concurrency=self.concurrency))
+            except BaseException:
+                with self._lock:
+                    for id, properties in batch.items():
+                        self._requeue(id, properties)
+                raise
+
+            with self._lock:
+                for result in results:
+                    if result.ok:
+                        self.stats['written'] += 1
+                    elif isinstance(result.error, NotionTransientError):
+                        self._requeue(*result.input)
+                    else:
+                        self.failed.append(result)
+                        self.stats['failed'] += 1
+                try:
+                    self._compact()
+                except Exception as e:
+                    # The journal still holds the batch: keep it queued so memory and journal agree
+                    self.errors.append(e)
+                    for result in results:
+                        if result.ok:
+                            self._requeue(*result.input)
+                    self._reopen_journal()
+            return results
+
+    def _compact(self):
+        # Called with the lock held: the journal only keeps what is still queued
+        if self._journal_file is None:
+            return
+        self._journal_file.close()
+        tmp = self.journal + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for id, properties in self._pending.items():
+                f.write(json.dumps({'id': id, 'properties': properties}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.journal)
+        self._journal_file = open(self.journal, 'a', encoding='utf-8')
+
+    def _reopen_journal(self):
+        if self._journal_file is not None and self._journal_file.closed:
+            try:
+                self._journal_file = open(self.journal, 'a', encoding='utf-8')
+            except OSError as e:
+                self.errors.append(e)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            if self._pending:
+                try:
+                    self.flush()
+                except Exception as e:
+                    self.errors.append(e)
+
+    def close(self):
+        """
+        Stop the worker and write what is still queued
+        """
+        atexit.unregister(self.close)
+        self._stop.set()
+        self._worker.join()
+        self.flush()
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
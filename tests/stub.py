@@ -0,0 +1,34 @@
+import json
+import requests
+
+
+def make_response(status: int = 200, body: dict = None, headers: dict = None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(body if body is not None else {}).encode()
+    response.headers.update(headers or {})
+    return response
+
+
+class StubSession:
+    """
+    Stands in for the requests.Session of a NotionApi: answers each request with `handler(method, url, kwargs)`,
+    which returns a response or raises, and records the calls
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.calls = []
+        self.headers = {}
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        return self.handler(method, url, kwargs)
+
+    def close(self):
+        pass
+
+
+def stub_api(api, handler):
+    api.session = StubSession(handler)
+    return api.session
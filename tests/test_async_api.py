@@ -0,0 +1,73 @@
+import asyncio
+import unittest
+import httpx
+from src.notiondb import AsyncNotionApi, NotionApi, NotionDatabase
+
+
+class TestAsyncClients(unittest.TestCase):
+
+    def test_shared_client_per_event_loop(self):
+        database = NotionDatabase(database_id='database-id', api=NotionApi('token'))
+
+        async def clients():
+            return database.async_api, database.async_api
+
+        first, same = asyncio.run(clients())
+        second, _ = asyncio.run(clients())
+        self.assertIs(first, same)
+        self.assertIsNot(first, second)
+
+    def test_given_async_client(self):
+        async def run():
+            api = AsyncNotionApi('token')
+            database = NotionDatabase(database_id='database-id', api=NotionApi('token'), async_api=api)
+            return api, database.async_api
+
+        api, used = asyncio.run(run())
+        self.assertIs(used, api)
+
+
+RELATED = [{'id': f'related-{i}'} for i in range(30)]
+
+
+def transport(request):
+    path = request.url.path
+    if '/properties/' in path:
+        # Relation items in pages of 20
+        start = int(request.url.params.get('start_cursor') or 0)
+        results = [{'object': 'property_item', 'type': 'relation', 'relation': item} for item in RELATED[start:start + 20]]
+        next_cursor = str(start + 20) if start + 20 < len(RELATED) else None
+        return httpx.Response(200, json={'object': 'list', 'results': results, 'next_cursor': next_cursor, 'has_more': bool(next_cursor)})
+    page = {
+        'object': 'page',
+        'id': 'page-id',
+        'properties': {'Related': {'id': 'rel', 'type': 'relation', 'relation': RELATED[:25], 'has_more': True}},
+    }
+    if path.endswith('/query'):
+        return httpx.Response(200, json={'object': 'list', 'results': [page], 'next_cursor': None})
+    return httpx.Response(200, json=page)
+
+
+class TestAsyncReads(unittest.TestCase):
+
+    def run_with_api(self, func):
+        async def run():
+            api = AsyncNotionApi('token', rate_limit=None)
+            api.session = httpx.AsyncClient(transport=httpx.MockTransport(transport))
+            database = NotionDatabase(database_id='database-id', api=NotionApi('token'), async_api=api)
+            return await func(api, database)
+        return asyncio.run(run())
+
+    def test_get_page_property_items(self):
+        items = self.run_with_api(lambda api, _: api.get_page_property_items('page-id', 'rel'))
+        self.assertEqual([item['relation']['id'] for item in items], [item['id'] for item in RELATED])
+
+    def test_truncated_properties_are_completed(self):
+        async def read(_, database):
+            rows = [row async for row in database.afind()]
+            return rows[0], await database.afind_one('page-id'), await database.afind_one('page-id', complete=False)
+
+        found, found_one, truncated = self.run_with_api(read)
+        self.assertEqual(len(found['Related']), 30)
+        self.assertEqual(len(found_one['Related']), 30)
+        self.assertEqual(len(truncated['Related']), 25)
@@ -0,0 +1,189 @@
+import asyncio
+import atexit
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import httpx
+from src.notiondb import AsyncNotionApi, NotionApi, NotionDatabase, NotionModel
+from src.notiondb.decoder import RowDecoder
+from src.notiondb.fields import NumberField
+from .stub import make_response, stub_api
+
+
+class Product(NotionModel):
+
+    price = NumberField('Price')
+
+
+class TestBulkWrites(unittest.TestCase):
+
+    def setUp(self):
+        self.database = NotionDatabase(database_id='database-id', api=NotionApi('token'))
+
+    def test_bulk_writes_require_a_target(self):
+        # Raised before any request is sent
+        with self.assertRaises(ValueError):
+            self.database.update_many(None, {'Price': {'number': 1}})
+        with self.assertRaises(ValueError):
+            self.database.archive_many(None)
+        with self.assertRaises(ValueError):
+            self.database.delete_many(None)
+        with self.assertRaises(ValueError):
+            Product.objects(self.database).update(None, price=1)
+        with self.assertRaises(ValueError):
+            Product.objects(self.database).delete(None)
+        with self.assertRaises(TypeError):
+            Product.objects(self.database).delete()
+
+
+class TestFilteredUpdates(unittest.TestCase):
+
+    def setUp(self):
+        self.database = NotionDatabase(database_id='database-id', api=NotionApi('token', rate_limit=None))
+        # Next pages are only queried once the previous ids were updated
+        self.database.DEFAULT_PREFETCH = 0
+        self.prices = {f'page-{i}': 1 for i in range(6)}
+
+        def handler(method, url, kwargs):
+            if url.endswith('/query'):
+                # Offset pagination over the rows matching now, two per page
+                matching = sorted(id for id, price in self.prices.items() if price == 1)
+                start = int(kwargs['json'].get('start_cursor') or 0)
+                next_cursor = str(start + 2) if start + 2 < len(matching) else None
+                return make_response(200, {'results': [page(id, 1) for id in matching[start:start + 2]], 'next_cursor': next_cursor})
+            id = url.rsplit('/', 1)[-1]
+            self.prices[id] = kwargs['json']['properties']['Price']['number']
+            return make_response(200, page(id, self.prices[id]))
+
+        self.session = stub_api(self.database.api, handler)
+
+    def test_rows_leaving_the_filter_are_all_updated(self):
+        filter = {'property': 'Price', 'number': {'equals': 1}}
+        results = list(self.database.update_many(filter, {'Price': {'number': 2}}, concurrency=1, ordered=True))
+        self.assertEqual(sorted(result.input for result in results), sorted(self.prices))
+        self.assertEqual(set(self.prices.values()), {2})
+
+
+def page(id: str, price: float, archived: bool = False):
+    return {
+        'object': 'page',
+        'id': id,
+        'archived': archived,
+        'properties': {'Price': {'id': 'p', 'type': 'number', 'number': price}},
+    }
+
+
+class CountingDecoder(RowDecoder):
+
+    decoded = 0
+
+    def decode(self, item: dict):
+        CountingDecoder.decoded += 1
+        return super().decode(item)
+
+
+class TestWrites(unittest.TestCase):
+
+    def setUp(self):
+        self.database = NotionDatabase(database_id='database-id', api=NotionApi('token', rate_limit=None))
+        self.pages = iter(range(100))
+
+        def handler(method, url, kwargs):
+            if url.endswith('/query'):
+                return make_response(200, {'results': [page('indexed', 1)], 'next_cursor': None})
+            return make_response(200, page(f'page-{next(self.pages)}', kwargs['json']['properties']['Price']['number']))
+
+        stub_api(self.database.api, handler)
+
+    def test_insert_many_without_parse_skips_decoding(self):
+        self.database._decoder = CountingDecoder()
+        CountingDecoder.decoded = 0
+        rows = [{'Price': {'number': 1}}, {'Price': {'number': 2}}]
+        result = list(self.database.insert_many(rows, parse=False))
+        self.assertTrue(all(item.ok and item.result['object'] == 'page' for item in result))
+        self.assertEqual(CountingDecoder.decoded, 0)
+
+        # Unless an index needs the rows
+        self.database.create_index('Price', kind='sorted')
+        list(self.database.insert_many([{'Price': {'number': 3}}], parse=False))
+        self.assertEqual([row['_id'] for row in self.database.find_range('Price', 3)], ['page-2'])
+
+    def test_async_writes_update_indexes(self):
+        self.database.create_index('Price', kind='sorted')
+
+        def transport(request):
+            body = json.loads(request.content or b'{}')
+            if body.get('archived'):
+                return httpx.Response(200, json=page('indexed', 1, archived=True))
+            return httpx.Response(200, json=page('indexed', body['properties']['Price']['number']))
+
+        async def run():
+            self.database._async_api = AsyncNotionApi('token', rate_limit=None)
+            self.database._async_api.session = httpx.AsyncClient(transport=httpx.MockTransport(transport))
+            await self.database.aupdate_one('indexed', {'Price': {'number': 5}})
+            updated = self.database.find_by('Price', 5)
+            await self.database.adelete_one('indexed')
+            return updated
+
+        updated = asyncio.run(run())
+        self.assertEqual([row['_id'] for row in updated], ['indexed'])
+        self.assertEqual(self.database.find_range('Price'), [])
+
+
+class TestWriteBehind(unittest.TestCase):
+
+    def setUp(self):
+        self.database = NotionDatabase(database_id='database-id', api=NotionApi('token', rate_limit=None))
+        self.sent = []
+
+        def handler(method, url, kwargs):
+            self.sent.append(kwargs['json']['properties'])
+            return make_response(200, page(url.rsplit('/', 1)[-1], kwargs['json']['properties']['Price']['number']))
+
+        stub_api(self.database.api, handler)
+        self.journal = os.path.join(tempfile.mkdtemp(), 'writes.jsonl')
+
+    def test_journal_errors_keep_updates_queued(self):
+        queue = self.database.enable_write_behind(flush_interval=60, journal=self.journal)
+        try:
+            queue.enqueue('page-1', {'Price': {'number': 1}})
+            with mock.patch('os.replace', side_effect=OSError('disk full')):
+                queue.flush()
+            self.assertEqual(len(queue), 1)
+            self.assertIsInstance(queue.errors[0], OSError)
+
+            # The journal is usable again and the next flush succeeds
+            queue.enqueue('page-1', {'Price': {'number': 2}})
+            queue.flush()
+            self.assertEqual(len(queue), 0)
+            self.assertEqual(self.sent[-1], {'Price': {'number': 2}})
+        finally:
+            self.database.disable_write_behind()
+        with open(self.journal) as f:
+            self.assertEqual(f.read(), '')
+
+    def test_worker_survives_errors(self):
+        queue = self.database.enable_write_behind(flush_interval=0.01)
+        try:
+            with mock.patch.object(queue, '_compact', side_effect=OSError('journal')):
+                queue.enqueue('page-1', {'Price': {'number': 1}})
+                while not queue.errors:
+                    queue._stop.wait(0.01)
+            self.assertTrue(queue._worker.is_alive())
+            while len(queue):
+                queue._stop.wait(0.01)
+            self.assertEqual(self.sent[-1], {'Price': {'number': 1}})
+        finally:
+            self.database.disable_write_behind()
+
+    def test_flushed_at_exit(self):
+        with mock.patch.object(atexit, 'register') as register, mock.patch.object(atexit, 'unregister') as unregister:
+            queue = self.database.enable_write_behind(flush_interval=60)
+            queue.enqueue('page-1', {'Price': {'number': 1}})
+            exit_handler, = register.call_args[0]
+            exit_handler()
+            unregister.assert_called_once_with(exit_handler)
+        self.assertEqual(self.sent, [{'Price': {'number': 1}}])
+        self.database.write_behind = None
@@ -0,0 +1,160 @@
+import unittest
+from unittest import mock
+from src.notiondb import NotionApi, ResponseCache
+from .stub import make_response, stub_api
+
+
+PAGE = 'pages/aaaa-1111'
+CHILDREN = 'blocks/bbbb2222/children'
+
+
+def page(id: str = 'aaaa-1111', parent: str = 'dddd3333'):
+    return make_response(200, {'object': 'page', 'id': id, 'parent': {'type': 'database_id', 'database_id': parent}})
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('src.notiondb.cache.time.monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_endpoint(self):
+        self.assertEqual(ResponseCache.endpoint(PAGE), ('pages', 'aaaa1111'))
+        self.assertEqual(ResponseCache.endpoint(CHILDREN + '?page_size=10'), ('block_children', 'bbbb2222'))
+        self.assertEqual(ResponseCache.endpoint('pages/AAAA-1111/properties/title'), ('page_properties', 'aaaa1111'))
+        self.assertEqual(ResponseCache.endpoint('search'), (None, None))
+        self.assertEqual(ResponseCache.endpoint('databases/x/query'), (None, None))
+
+    def test_ttl(self):
+        cache = ResponseCache(ttl={'pages': 10})
+        cache.set('page', PAGE, page())
+        cache.set('search', 'search', page())
+        self.assertIsNotNone(cache.get('page'))
+        self.assertIsNone(cache.get('search'))
+
+        self.now += 11
+        self.assertIsNone(cache.get('page'))
+        self.assertEqual(cache.stats['entries'], 0)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=2)
+        for id in ('p1', 'p2'):
+            cache.set(id, f'pages/{id}', page(id))
+        cache.get('p1')
+        cache.set('p3', 'pages/p3', page('p3'))
+        self.assertIsNone(cache.get('p2'))
+        self.assertIsNotNone(cache.get('p1'))
+        self.assertIsNotNone(cache.get('p3'))
+        self.assertEqual(cache.evictions, 1)
+
+    def test_size_eviction(self):
+        size = len(page('p1').content)
+        cache = ResponseCache(max_bytes=size * 2)
+        for id in ('p1', 'p2', 'p3'):
+            cache.set(id, f'pages/{id}', page(id))
+        self.assertEqual(cache.stats['entries'], 2)
+        self.assertLessEqual(cache.size, size * 2)
+        self.assertIsNone(cache.get('p1'))
+
+        # Larger than the whole cache: not stored
+        cache = ResponseCache(max_bytes=size - 1)
+        cache.set('p1', 'pages/p1', page('p1'))
+        self.assertEqual(cache.stats['entries'], 0)
+
+    def test_generation_guard(self):
+        cache = ResponseCache()
+        generation = cache.begin_read(PAGE)
+        # Written while the GET was in flight
+        cache.invalidate('aaaa1111')
+        cache.set('page', PAGE, page(), generation)
+        cache.end_read(PAGE)
+        self.assertIsNone(cache.get('page'))
+
+        generation = cache.begin_read(PAGE)
+        cache.set('page', PAGE, page(), generation)
+        cache.end_read(PAGE)
+        self.assertIsNotNone(cache.get('page'))
+
+    def test_generations_are_bounded(self):
+        cache = ResponseCache()
+        for i in range(100):
+            cache.invalidate(f'page-{i}', 'parent')
+        self.assertEqual(cache._generations, {})
+
+        cache.begin_read(PAGE)
+        cache.invalidate('aaaa1111')
+        self.assertEqual(len(cache._generations), 1)
+        cache.end_read(PAGE)
+        self.assertEqual((cache._generations, cache._readers), ({}, {}))
+
+    def test_write_invalidation(self):
+        cache = ResponseCache()
+        children = make_response(200, {'results': [{'id': 'aaaa-1111'}, {'id': 'cccc-3333'}]})
+        cache.set('page', PAGE, page())
+        cache.set('block', 'blocks/aaaa1111', page())
+        cache.set('children', CHILDREN, children)
+        cache.set('database', 'databases/dddd-3333', page('dddd3333'))
+        cache.set('other', 'pages/eeee', page('eeee'))
+
+        # Writing the page drops its page and block entries, the children list holding it
+        # and its parent database
+        cache.invalidate_write('pages/AAAA1111', {'id': 'aaaa-1111', 'parent': {'type': 'database_id', 'database_id': 'dddd-3333'}})
+        for key in ('page', 'block', 'children', 'database'):
+            self.assertIsNone(cache.get(key), key)
+        self.assertIsNotNone(cache.get('other'))
+        self.assertEqual(cache.stats['entries'], 1)
+
+        # A failed write still drops the written object
+        cache.invalidate_write('pages/eeee')
+        self.assertIsNone(cache.get('other'))
+
+
+class TestApiCache(unittest.TestCase):
+
+    def setUp(self):
+        self.api = NotionApi('token', rate_limit=None, cache=ResponseCache())
+        self.pages = {'aaaa1111': 1}
+
+        def handler(method, url, kwargs):
+            if method == 'PATCH':
+                self.pages['aaaa1111'] += 1
+            return make_response(200, {'object': 'page', 'id': 'aaaa-1111', 'version': self.pages['aaaa1111'], 'parent': {'type': 'page_id', 'page_id': 'ffff'}})
+
+        self.session = stub_api(self.api, handler)
+
+    def gets(self):
+        return [call for call in self.session.calls if call[0] == 'GET']
+
+    def test_cached_reads(self):
+        self.assertEqual(self.api.get_page('aaaa-1111')['version'], 1)
+        self.assertEqual(self.api.get_page('aaaa-1111')['version'], 1)
+        self.assertEqual(len(self.gets()), 1)
+        self.assertEqual(self.api.cache_stats['hits'], 1)
+
+    def test_write_invalidates(self):
+        self.api.get_page('aaaa-1111')
+        self.api.update_page('aaaa-1111', properties={})
+        self.assertEqual(self.api.get_page('aaaa-1111')['version'], 2)
+        self.assertEqual(len(self.gets()), 2)
+
+        for _ in range(50):
+            self.api.update_page('aaaa-1111', properties={})
+        self.assertEqual((self.api.cache._generations, self.api.cache._readers), ({}, {}))
+
+    def test_queries_do_not_invalidate(self):
+        self.api.get_page('aaaa-1111')
+        with mock.patch.object(self.api.cache, 'invalidate_write') as invalidate_write:
+            self.api.query_database('dddd3333')
+            self.api.search('page')
+        invalidate_write.assert_not_called()
+        self.api.get_page('aaaa-1111')
+        self.assertEqual(len(self.gets()), 1)
+
+    def test_errors_are_not_cached(self):
+        self.session.handler = lambda method, url, kwargs: make_response(404, {'object': 'error', 'status': 404, 'code': 'object_not_found', 'message': 'missing'})
+        self.api.get_page('aaaa-1111')
+        self.api.get_page('aaaa-1111')
+        self.assertEqual(len(self.gets()), 2)
@@ -0,0 +1,79 @@
+import asyncio
+import unittest
+import httpx
+from src.notiondb import AsyncNotionApi, NotionApi, NotionDatabase
+from .stub import make_response, stub_api
+
+
+def block(id: str, has_children: bool = False):
+    return {'object': 'block', 'id': id, 'type': 'paragraph', 'has_children': has_children}
+
+
+# Block id -> pages of children
+TREE = {
+    'page': [[block('b1', True), block('b2')], [block('b3', True)]],
+    'b1': [[block('b1a', True)]],
+    'b1a': [[block('b1a1')]],
+    'b3': [[block('b3a')]],
+}
+
+
+def children_page(id: str, start_cursor: str = None):
+    pages = TREE[id]
+    index = int(start_cursor or 0)
+    next_cursor = str(index + 1) if index + 1 < len(pages) else None
+    return {'object': 'list', 'results': pages[index], 'next_cursor': next_cursor, 'has_more': bool(next_cursor)}
+
+
+def shape(blocks: list):
+    return [(item['id'], shape(item['children'])) if 'children' in item else item['id'] for item in blocks]
+
+
+class TestChildren(unittest.TestCase):
+
+    def setUp(self):
+        self.database = NotionDatabase(database_id='database-id', api=NotionApi('token', rate_limit=None))
+
+        def handler(method, url, kwargs):
+            id = url.split('/blocks/', 1)[1].split('/', 1)[0]
+            return make_response(200, children_page(id, kwargs['params'].get('start_cursor')))
+
+        self.session = stub_api(self.database.api, handler)
+
+    def requested(self):
+        return sorted(url.split('/blocks/', 1)[1] for _, url, _ in self.session.calls)
+
+    def test_tree(self):
+        children = self.database.get_children('page', concurrency=2)
+        self.assertEqual(shape(children), [('b1', [('b1a', ['b1a1'])]), 'b2', ('b3', ['b3a'])])
+        self.assertEqual(self.requested(), ['b1/children', 'b1a/children', 'b3/children', 'page/children', 'page/children'])
+
+    def test_max_depth(self):
+        self.assertEqual(shape(self.database.get_children('page', max_depth=1)), ['b1', 'b2', 'b3'])
+        self.assertEqual(self.requested(), ['page/children', 'page/children'])
+
+        self.session.calls.clear()
+        children = self.database.get_children('page', max_depth=2)
+        self.assertEqual(shape(children), [('b1', ['b1a']), 'b2', ('b3', ['b3a'])])
+        self.assertNotIn('b1a/children', self.requested())
+
+        with self.assertRaises(ValueError):
+            self.database.get_children('page', max_depth=0)
+        self.assertEqual(len(self.session.calls), 4)
+
+    def test_async_tree(self):
+        def transport(request):
+            id = request.url.path.split('/blocks/', 1)[1].split('/', 1)[0]
+            return httpx.Response(200, json=children_page(id, request.url.params.get('start_cursor')))
+
+        async def run():
+            api = AsyncNotionApi('token', rate_limit=None)
+            api.session = httpx.AsyncClient(transport=httpx.MockTransport(transport))
+            self.database._async_api = api
+            with self.assertRaises(ValueError):
+                await self.database.aget_children('page', max_depth=0)
+            return await self.database.aget_children('page'), await self.database.aget_children('page', max_depth=2)
+
+        children, limited = asyncio.run(run())
+        self.assertEqual(shape(children), [('b1', [('b1a', ['b1a1'])]), 'b2', ('b3', ['b3a'])])
+        self.assertEqual(shape(limited), [('b1', ['b1a']), 'b2', ('b3', ['b3a'])])
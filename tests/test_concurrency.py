@@ -0,0 +1,157 @@
+import contextvars
+import threading
+import time
+import unittest
+from src.notiondb.concurrency import SingleFlight, read_ahead, run_concurrently
+
+
+request_id = contextvars.ContextVar('request_id', default=None)
+
+
+class TestReadAhead(unittest.TestCase):
+
+    def test_pages_in_order(self):
+        pages = {None: ([1, 2], 'b'), 'b': ([3], 'c'), 'c': (None, None)}
+        self.assertEqual(list(read_ahead(pages.__getitem__)), [[1, 2], [3], []])
+        self.assertEqual(list(read_ahead(pages.__getitem__, start_cursor='b', depth=3)), [[3], []])
+
+    def test_errors_reach_the_caller(self):
+        def fetch(cursor):
+            if cursor:
+                raise ValueError('page 2')
+            return [1], 'next'
+
+        pages = read_ahead(fetch)
+        self.assertEqual(next(pages), [1])
+        with self.assertRaisesRegex(ValueError, 'page 2'):
+            next(pages)
+
+    def test_early_stop(self):
+        fetched = []
+
+        def fetch(cursor):
+            cursor = (cursor or 0) + 1
+            fetched.append(cursor)
+            return [cursor], cursor
+
+        pages = read_ahead(fetch, depth=2)
+        self.assertEqual(next(pages), [1])
+        pages.close()
+        time.sleep(0.3)
+        # The producer stops within depth pages of what was consumed
+        count = len(fetched)
+        time.sleep(0.2)
+        self.assertEqual(len(fetched), count)
+        self.assertLessEqual(count, 5)
+
+
+class TestRunConcurrently(unittest.TestCase):
+
+    def test_ordered(self):
+        def slow_first(item):
+            time.sleep(0.05 if item == 0 else 0)
+            return item * 10
+
+        results = list(run_concurrently(slow_first, range(5), concurrency=3, ordered=True))
+        self.assertEqual([result.index for result in results], [0, 1, 2, 3, 4])
+        self.assertEqual([result.result for result in results], [0, 10, 20, 30, 40])
+
+        results = list(run_concurrently(slow_first, range(5), concurrency=3))
+        self.assertNotEqual(results[0].index, 0)
+        self.assertEqual(sorted(result.result for result in results), [0, 10, 20, 30, 40])
+
+    def test_bounded_in_flight(self):
+        lock = threading.Lock()
+        running = [0, 0]  # now, max
+
+        def work(item):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return item
+
+        consumed = []
+
+        def items():
+            for item in range(20):
+                consumed.append(item)
+                yield item
+
+        results = run_concurrently(work, items(), concurrency=4)
+        next(results)
+        # Items are pulled lazily
+        self.assertLessEqual(len(consumed), 6)
+        self.assertEqual(len(list(results)), 19)
+        self.assertLessEqual(running[1], 4)
+
+    def test_errors_in_results(self):
+        def work(item):
+            if item == 1:
+                raise ValueError(item)
+            return item
+
+        results = sorted(run_concurrently(work, ['0', 1, '2']), key=lambda result: result.index)
+        self.assertEqual([result.ok for result in results], [True, False, True])
+        self.assertIsInstance(results[1].error, ValueError)
+        self.assertEqual(results[1].input, 1)
+        self.assertIsNone(results[1].result)
+
+    def test_context_propagation(self):
+        token = request_id.set('caller')
+        self.addCleanup(request_id.reset, token)
+        results = run_concurrently(lambda item: request_id.get(), range(3))
+        self.assertEqual([result.result for result in results], ['caller'] * 3)
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def run_together(self, flight, func, count=5):
+        release = threading.Event()
+        outcomes = []
+
+        def call():
+            try:
+                outcomes.append(flight.do('key', lambda: func(release)))
+            except Exception as e:
+                outcomes.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+        return outcomes
+
+    def test_shared_result(self):
+        calls = []
+
+        def func(release):
+            calls.append(1)
+            release.wait()
+            return object()
+
+        outcomes = self.run_together(SingleFlight(), func)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(outcomes), 5)
+        self.assertTrue(all(outcome is outcomes[0] for outcome in outcomes))
+
+    def test_shared_exception(self):
+        calls = []
+
+        def func(release):
+            calls.append(1)
+            release.wait()
+            raise ValueError('failed')
+
+        flight = SingleFlight()
+        outcomes = self.run_together(flight, func)
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(isinstance(outcome, ValueError) for outcome in outcomes))
+
+        # Done calls are forgotten: the next call runs again
+        self.assertEqual(flight.do('key', lambda: 'again'), 'again')
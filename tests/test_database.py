@@ -1,7 +1,7 @@
 
 import unittest
 import os
-from src.notiondb import NotionDatabase, NotionModel
+from src.notiondb import NotionDatabase, NotionModel, Session, SQLiteMirror
 from src.notiondb.fields import *
 from src.notiondb.block import *
 from .env import load_env
@@ -128,6 +128,61 @@ class TestDatabase(unittest.TestCase):
         result = self.database.delete_many(ids=item_ids)
         self.assertEqual(len([item for item in result if item.get('_archived')]), item_count)
 
+    @unittest.skipIf(skipTests, '...')
+    def test_db_f_insert_many(self):
+        rows = []
+        item_count = 5
+
+        for i in range(item_count):
+            props: List[BaseField] = [
+                TitleField('Name', f"Bulk Kale {i}"),
+                NumberField('Price', i),
+            ]
+            props_obj = {}
+            for prop in props:
+                prop.value = prop.default
+                props_obj.update(prop.update_prop)
+            rows.append(props_obj)
+
+        result = list(self.database.insert_many(rows, concurrency=3, ordered=True))
+        self.assertEqual([item.index for item in result], list(range(item_count)))
+        self.assertTrue(all(item.ok for item in result))
+        self.assertEqual(result[2].result.get('Name'), 'Bulk Kale 2')
+        TestDatabase.bulk_ids = [item.result.get('_id') for item in result]
+
+    @unittest.skipIf(skipTests, '...')
+    def test_db_g_update_many(self):
+        price = NumberField('Price')
+        price.value = 9
+        result = list(self.database.update_many(self.bulk_ids, price.update_prop, concurrency=3))
+        self.assertTrue(all(item.ok and item.result.get('Price') == 9 for item in result))
+        self.assertEqual(len(result), len(self.bulk_ids))
+
+    @unittest.skipIf(skipTests, '...')
+    def test_db_h_sqlite_mirror(self):
+        with SQLiteMirror(self.database, ':memory:') as mirror:
+            stats = mirror.sync()
+            self.assertIsNotNone(stats['watermark'])
+            prices = mirror.query(f'SELECT "Price" FROM "{mirror.table}" WHERE _id IN ({",".join("?" * len(self.bulk_ids))})', tuple(self.bulk_ids))
+            self.assertEqual([price for price, in prices], [9] * len(self.bulk_ids))
+
+            # Only the pages edited in the watermark's minute are pulled again
+            stats = mirror.sync()
+            self.assertLessEqual(stats['upserted'], len(mirror.query(f'SELECT _id FROM "{mirror.table}"')))
+
+    @unittest.skipIf(skipTests, '...')
+    def test_db_i_upsert_many(self):
+        rows = [
+            {'Name': 'Bulk Kale 0', 'Price': 9},
+            {'Name': 'Bulk Kale 1', 'Price': 10},
+            {'Name': 'Upserted Kale', 'Price': 1, 'Food group': '🥦Vegetable'},
+        ]
+        result = list(self.database.upsert_many(rows, key='Name', ordered=True))
+        self.assertTrue(all(item.ok for item in result))
+        self.assertEqual([item.result.action for item in result], ['unchanged', 'updated', 'created'])
+        self.assertEqual(result[1].result.row.get('Price'), 10)
+        self.assertEqual(result[2].result.row.get('Food group', {}).get('name'), '🥦Vegetable')
+
     # Test NotionModel
 
     @unittest.skipIf(skipTests, '...')
@@ -236,6 +291,44 @@ class TestDatabase(unittest.TestCase):
 
         self.assertGreater(len(result), 0)
 
+    @unittest.skipIf(skipTests, '...')
+    def test_model_e_session(self):
+        with Session(concurrency=3) as session:
+            model = TestNotionModel.from_id(self.database, self.model_id)
+            model.price.value = 4.5
+
+            new_models = [session.add(TestNotionModel(self.database)) for _ in range(3)]
+            for i, new_model in enumerate(new_models):
+                new_model.name.value = f'Session {i}'
+
+            self.assertEqual(len(session.dirty), 4)
+            result = session.commit()
+
+            self.assertEqual(len(result), 4)
+            self.assertTrue(all(item.ok for item in result))
+            self.assertTrue(all(new_model.id for new_model in new_models))
+            self.assertEqual(session.dirty, [])
+            self.assertEqual(self.database.find_one(self.model_id).get('Price'), 4.5)
+
+    @unittest.skipIf(skipTests, '...')
+    def test_model_e_write_behind(self):
+        self.database.enable_write_behind(flush_interval=60)
+        try:
+            model = TestNotionModel.from_id(self.database, self.model_id)
+            for price in (1, 2, 3):
+                model.price.value = price
+                self.assertIsNone(model.save())
+            model.name.value = 'Name write-behind'
+            model.save()
+
+            result = self.database.flush()
+            self.assertEqual(len(result), 1)
+            self.assertTrue(result[0].ok)
+            self.assertEqual(result[0].result.get('Price'), 3)
+            self.assertEqual(result[0].result.get('Name'), 'Name write-behind')
+        finally:
+            self.database.disable_write_behind()
+
     @unittest.skipIf(skipTests, '...')
     def test_model_f_delete_model(self):
         self.test_model_a_create_model()
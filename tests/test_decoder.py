@@ -0,0 +1,75 @@
+import copy
+import unittest
+from src.notiondb.block_parser import BlockParser
+from src.notiondb.decoder import RowDecoder
+
+
+PAGE = {
+    'object': 'page',
+    'id': 'page-id',
+    'archived': True,
+    'properties': {
+        'Name': {'id': 'title', 'type': 'title', 'title': [{'plain_text': 'Tuscan '}, {'plain_text': 'Kale'}]},
+        'Description': {'id': 'a', 'type': 'rich_text', 'rich_text': []},
+        'Empty text': {'id': 'b', 'type': 'rich_text', 'rich_text': None},
+        'In stock': {'id': 'c', 'type': 'checkbox', 'checkbox': True},
+        'Price': {'id': 'd', 'type': 'number', 'number': 2.5},
+        'Food group': {'id': 'e', 'type': 'select', 'select': {'name': 'Vegetable', 'color': 'green'}},
+        'No group': {'id': 'f', 'type': 'select', 'select': None},
+        'Tags': {'id': 'g', 'type': 'multi_select', 'multi_select': [{'name': 'a', 'color': 'red'}, {'name': 'b'}]},
+        'No tags': {'id': 'h', 'type': 'multi_select', 'multi_select': []},
+        'Last ordered': {'id': 'i', 'type': 'date', 'date': {'start': '2021-11-11', 'end': None}},
+        'Link': {'id': 'j', 'type': 'url', 'url': 'https://example.com'},
+        'Related': {'id': 'k', 'type': 'relation', 'relation': [{'id': 'r1'}, {'id': 'r2'}]},
+        'Created': {'id': 'l', 'type': 'created_time', 'created_time': '2021-11-11T10:22:00.000Z'},
+        'Edited': {'id': 'm', 'type': 'last_edited_time', 'last_edited_time': 'not a time'},
+        'Formula': {'id': 'n', 'type': 'formula', 'formula': {'type': 'number', 'number': 1}},
+    },
+}
+
+
+def parse_with_block_parser(item):
+    result = {
+        '_id': item.get('id'),
+    }
+    if item.get('archived'):
+        result.update({
+            '_archived': True,
+        })
+    properties = item.get('properties', {})
+    for prop in properties.keys():
+        result[prop] = BlockParser(properties[prop]).value
+    return result
+
+
+class TestDecoder(unittest.TestCase):
+
+    def test_decode_matches_block_parser(self):
+        expected = parse_with_block_parser(copy.deepcopy(PAGE))
+        schema = {name: {'id': prop['id'], 'type': prop['type']} for name, prop in PAGE['properties'].items()}
+
+        self.assertEqual(RowDecoder(schema).decode(copy.deepcopy(PAGE)), expected)
+        # Without a schema, property types are learned from the row
+        self.assertEqual(RowDecoder().decode(copy.deepcopy(PAGE)), expected)
+
+    def test_decode_type_changed_since_schema(self):
+        decoder = RowDecoder({'Price': {'type': 'rich_text'}})
+        row = decoder.decode({'id': 'x', 'properties': {'Price': {'type': 'number', 'number': 3}}})
+        self.assertEqual(row, {'_id': 'x', 'Price': 3})
+
+    def test_lazy_row(self):
+        expected = parse_with_block_parser(copy.deepcopy(PAGE))
+        row = RowDecoder().lazy_rows([copy.deepcopy(PAGE)])[0]
+
+        self.assertEqual(row['Name'], 'Tuscan Kale')
+        self.assertEqual(row['_id'], 'page-id')
+        self.assertNotIn('Price', row._values)
+        self.assertIn('Price', row)
+        self.assertIsNone(row.get('Missing'))
+        self.assertEqual(list(row), list(expected))
+        self.assertEqual(dict(row), expected)
+
+        row['children'] = []
+        del row['Price']
+        self.assertEqual(list(row)[-1], 'children')
+        self.assertNotIn('Price', row)
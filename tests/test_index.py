@@ -0,0 +1,48 @@
+import unittest
+from src.notiondb.index import HashIndex, RowIndex, SortedIndex
+
+
+ROWS = [
+    {'_id': 'a', 'SKU': 'K-1', 'Price': 2.5, 'Tags': [{'name': 'green'}], 'Last ordered': {'start': '2021-11-11'}},
+    {'_id': 'b', 'SKU': 'A-1', 'Price': 1, 'Tags': [], 'Last ordered': None},
+    {'_id': 'c', 'SKU': 'K-2', 'Price': 2.5, 'Tags': [{'name': 'green'}, {'name': 'leafy'}], 'Last ordered': {'start': '2021-11-12'}},
+]
+
+
+class TestIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = RowIndex()
+        for row in ROWS:
+            self.index.put(dict(row))
+        self.index.add_index(HashIndex('SKU'))
+        self.index.add_index(HashIndex('Tags'))
+        self.index.add_index(SortedIndex('Price'))
+        self.index.add_index(SortedIndex('Last ordered'))
+
+    def ids(self, rows):
+        return sorted(row['_id'] for row in rows)
+
+    def test_hash_index(self):
+        self.assertEqual(self.ids(self.index.find('SKU', 'K-2')), ['c'])
+        self.assertEqual(self.ids(self.index.find('SKU', 'missing')), [])
+        self.assertEqual(self.ids(self.index.find('Tags', 'green')), ['a', 'c'])
+
+    def test_sorted_index(self):
+        self.assertEqual([row['_id'] for row in self.index.range('Price', 2)], ['a', 'c'])
+        self.assertEqual([row['_id'] for row in self.index.range('Price', high=2.5)], ['b', 'a', 'c'])
+        self.assertEqual(self.ids(self.index.find('Price', 2.5)), ['a', 'c'])
+        self.assertEqual([row['_id'] for row in self.index.range('Last ordered', '2021-11-12')], ['c'])
+        with self.assertRaises(TypeError):
+            self.index.range('SKU', 'A')
+
+    def test_updates(self):
+        self.index.put({'_id': 'a', 'SKU': 'K-9', 'Price': 10, 'Tags': []})
+        self.assertEqual(self.index.find('SKU', 'K-1'), [])
+        self.assertEqual(self.ids(self.index.find('SKU', 'K-9')), ['a'])
+        self.assertEqual(self.ids(self.index.find('Tags', 'green')), ['c'])
+        self.assertEqual([row['_id'] for row in self.index.range('Price', 5)], ['a'])
+
+        self.index.put({'_id': 'c', '_archived': True, 'SKU': 'K-2'})
+        self.assertEqual(self.index.find('SKU', 'K-2'), [])
+        self.assertNotIn('c', self.index.rows)
@@ -0,0 +1,99 @@
+import unittest
+from datetime import datetime
+from src.notiondb.fields import NumberField, SelectField, TitleField
+from src.notiondb.local_query import LocalQuery, compile_filter
+
+
+ROWS = [
+    {
+        '_id': 'a',
+        'Name': 'Tuscan Kale',
+        'Price': 2.5,
+        'In stock': True,
+        'Food group': {'name': 'Vegetable', 'color': 'green'},
+        'Tags': [{'name': 'green'}, {'name': 'leafy'}],
+        'Related': ['1111-2222'],
+        'Last ordered': {'start': '2021-11-11T10:00:00.000+07:00', 'end': None},
+        'Created': datetime(2021, 11, 1, 9, 0),
+    },
+    {
+        '_id': 'b',
+        'Name': 'Apple',
+        'Price': 1,
+        'In stock': False,
+        'Food group': {'name': 'Fruit', 'color': 'red'},
+        'Tags': [],
+        'Related': [],
+        'Last ordered': None,
+        'Created': datetime(2021, 11, 2, 9, 0),
+    },
+    # SQLiteMirror shapes: select names, JSON lists, integer checkboxes
+    {
+        '_id': 'c',
+        'Name': 'Kale chips',
+        'Price': None,
+        'In stock': 1,
+        'Food group': 'Vegetable',
+        'Tags': '["leafy"]',
+        'Related': '["11112222"]',
+        'Last ordered': '2021-11-12',
+        'Created': '2021-11-03T09:00:00.000Z',
+    },
+]
+
+
+def ids(rows):
+    return [row['_id'] for row in rows]
+
+
+class TestLocalQuery(unittest.TestCase):
+
+    def test_text_filters(self):
+        self.assertEqual(ids(LocalQuery(TitleField('Name').query_filter({'contains': 'kale'})).run(ROWS)), ['a', 'c'])
+        self.assertEqual(ids(LocalQuery({'property': 'Name', 'title': {'equals': 'Apple'}}).run(ROWS)), ['b'])
+        self.assertEqual(ids(LocalQuery({'property': 'Name', 'title': {'is_empty': True}}).run(ROWS)), [])
+
+    def test_number_select_checkbox_filters(self):
+        self.assertEqual(ids(LocalQuery(NumberField('Price').query_filter({'greater_than': 1})).run(ROWS)), ['a'])
+        self.assertEqual(ids(LocalQuery(NumberField('Price').query_filter({'is_empty': True})).run(ROWS)), ['c'])
+        self.assertEqual(ids(LocalQuery(SelectField('Food group').query_filter({'equals': 'Vegetable'})).run(ROWS)), ['a', 'c'])
+        self.assertEqual(ids(LocalQuery({'property': 'In stock', 'checkbox': {'equals': True}}).run(ROWS)), ['a', 'c'])
+
+    def test_list_filters(self):
+        self.assertEqual(ids(LocalQuery({'property': 'Tags', 'multi_select': {'contains': 'leafy'}}).run(ROWS)), ['a', 'c'])
+        self.assertEqual(ids(LocalQuery({'property': 'Tags', 'multi_select': {'is_empty': True}}).run(ROWS)), ['b'])
+        self.assertEqual(ids(LocalQuery({'property': 'Related', 'relation': {'contains': '11112222'}}).run(ROWS)), ['a', 'c'])
+
+    def test_date_filters(self):
+        self.assertEqual(ids(LocalQuery({'property': 'Last ordered', 'date': {'on_or_after': '2021-11-11T03:00:00Z'}}).run(ROWS)), ['a', 'c'])
+        self.assertEqual(ids(LocalQuery({'property': 'Last ordered', 'date': {'equals': '2021-11-12'}}).run(ROWS)), ['c'])
+        self.assertEqual(ids(LocalQuery({'property': 'Last ordered', 'date': {'is_empty': True}}).run(ROWS)), ['b'])
+        self.assertEqual(ids(LocalQuery({'property': 'Created', 'created_time': {'before': '2021-11-03'}}).run(ROWS)), ['a', 'b'])
+
+    def test_compound_filters(self):
+        filter = {
+            'or': [
+                {'property': 'Food group', 'select': {'equals': 'Fruit'}},
+                {'and': [
+                    {'property': 'Name', 'title': {'starts_with': 'kale'}},
+                    {'property': 'In stock', 'checkbox': {'equals': True}},
+                ]},
+            ]
+        }
+        self.assertEqual(ids(LocalQuery(filter).run(ROWS)), ['b', 'c'])
+
+    def test_invalid_filters(self):
+        with self.assertRaises(ValueError):
+            compile_filter({'property': 'Price', 'number': {'around': 1}})
+        with self.assertRaises(ValueError):
+            compile_filter({'property': 'Price', 'files': {'is_empty': True}})
+
+    def test_sorts(self):
+        query = LocalQuery(sorts=[{'property': 'Price', 'direction': 'descending'}])
+        self.assertEqual(ids(query.run(ROWS)), ['a', 'b', 'c'])
+        # Empty values last in both directions
+        query = LocalQuery(sorts=[{'property': 'Price', 'direction': 'ascending'}])
+        self.assertEqual(ids(query.run(ROWS)), ['b', 'a', 'c'])
+
+        query = LocalQuery(sorts=[{'property': 'Food group', 'direction': 'descending'}, {'property': 'Name', 'direction': 'ascending'}])
+        self.assertEqual(ids(query.run(ROWS, limit=2)), ['c', 'a'])
@@ -0,0 +1,82 @@
+import unittest
+from src.notiondb import NotionModel
+from src.notiondb.fields import BaseField, CheckboxField, NumberField, SelectField, TitleField
+
+
+class Product(NotionModel):
+
+    name = TitleField('Name')
+    price = NumberField('Price', format='dollar')
+
+
+class Fruit(Product):
+
+    color = SelectField('Color', options=[{'name': 'red'}])
+
+
+class Mixed(NotionModel):
+
+    name = TitleField('Name')
+
+    def __init__(self, database=None, id=None):
+        super().__init__(database, id)
+        self.in_stock = CheckboxField('In stock')
+        self.note = 'not a field'
+
+
+ROW = {'_id': 'page-1', 'Name': 'Apple', 'Price': 2.5, 'Color': 'red', 'In stock': True, 'Other': 1}
+
+
+class TestModel(unittest.TestCase):
+
+    def test_declared_fields(self):
+        self.assertEqual(list(Product._declared_fields), ['name', 'price'])
+        self.assertEqual(Product.__slots__, ('name', 'price'))
+        product = Product()
+        self.assertFalse(hasattr(product, '__dict__'))
+        self.assertEqual([field.name for field in product.fields], ['Name', 'Price'])
+        self.assertEqual(product.price.format, 'dollar')
+        # The class attributes are replaced by slots; instances hold copies
+        self.assertNotIsInstance(vars(Product)['name'], BaseField)
+        self.assertIsNot(Product._declared_fields['name'], product.name)
+
+    def test_subclass_adds_fields(self):
+        self.assertEqual(list(Fruit._declared_fields), ['name', 'price', 'color'])
+        self.assertEqual(Fruit.__slots__, ('color',))
+        fruit = Fruit()
+        self.assertEqual([field.name for field in fruit.fields], ['Name', 'Price', 'Color'])
+        self.assertEqual(fruit.color.options, [{'name': 'red'}])
+        # The parent class is unchanged
+        self.assertEqual([field.name for field in Product().fields], ['Name', 'Price'])
+
+    def test_declared_and_init_fields(self):
+        mixed = Mixed()
+        self.assertEqual([field.name for field in mixed.fields], ['Name', 'In stock'])
+        self.assertEqual(mixed.note, 'not a field')
+        mixed.hydrate(ROW)
+        self.assertEqual(mixed.name.value, 'Apple')
+        self.assertTrue(mixed.in_stock.value)
+
+    def test_fields_are_not_shared(self):
+        first, second = Product(), Product()
+        self.assertIsNot(first.price, second.price)
+        first.price.value = 3
+        self.assertEqual(first.price.value, 3)
+        self.assertTrue(first.price.is_updated)
+        self.assertIsNone(second.price.value)
+        self.assertFalse(second.price.is_updated)
+        self.assertIsNone(Product._declared_fields['price'].value)
+        self.assertEqual(first.get_update_props(), {'Price': {'number': 3}})
+        self.assertEqual(second.get_update_props(), {})
+
+    def test_from_data(self):
+        fruit = Fruit.from_data(None, ROW)
+        self.assertEqual(fruit.id, 'page-1')
+        self.assertEqual((fruit.name.value, fruit.price.value, fruit.color.value), ('Apple', 2.5, 'red'))
+        # Hydration is not an update
+        self.assertEqual(fruit.get_update_props(), {})
+
+        # Missing properties keep their default
+        product = Product.from_data(None, {'_id': 'page-2', 'Name': 'Pear'})
+        self.assertEqual(product.name.value, 'Pear')
+        self.assertIsNone(product.price.value)
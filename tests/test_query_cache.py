@@ -0,0 +1,114 @@
+from datetime import datetime
+import unittest
+from unittest import mock
+from src.notiondb import NotionApi, NotionDatabase, QueryCache
+from .stub import make_response, stub_api
+
+
+def page(id: str, edited: str, price: float = 1):
+    return {
+        'object': 'page',
+        'id': id,
+        'last_edited_time': edited,
+        'properties': {'Price': {'id': 'p', 'type': 'number', 'number': price}},
+    }
+
+
+FILTER = {'property': 'Price', 'number': {'greater_than': 0}}
+
+
+class TestQueryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = QueryCache()
+        self.database = NotionDatabase(database_id='database-id', api=NotionApi('token', rate_limit=None), query_cache=self.cache)
+        self.rows = [page('a', '2021-11-11T10:00:00.000Z'), page('b', '2021-11-11T09:00:00.000Z')]
+        self.queries = 0  # result pages fetched, probes aside
+        stub_api(self.database.api, self.handle)
+        self.now = datetime(2021, 11, 11, 10, 5)
+        patcher = mock.patch.object(self.cache, 'now', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def handle(self, method, url, kwargs):
+        if url.endswith('/query'):
+            body = kwargs['json']
+            if body.get('sorts') == QueryCache.PROBE_SORTS:
+                latest = max(self.rows, key=lambda row: row['last_edited_time'])
+                return make_response(200, {'object': 'list', 'results': [latest], 'next_cursor': None})
+            self.queries += 1
+            # One row per page
+            start = int(body.get('start_cursor') or 0)
+            next_cursor = str(start + 1) if start + 1 < len(self.rows) else None
+            return make_response(200, {'object': 'list', 'results': self.rows[start:start + 1], 'next_cursor': next_cursor})
+        return make_response(200, page(url.rsplit('/', 1)[-1], '2021-11-11T10:05:00.000Z', price=kwargs['json']['properties']['Price']['number']))
+
+    def find(self, **kwargs):
+        return [row['_id'] for row in self.database.find(FILTER, **kwargs)]
+
+    def test_hit_after_unchanged_probe(self):
+        self.assertEqual(self.find(), ['a', 'b'])
+        self.assertEqual(self.find(), ['a', 'b'])
+        self.assertEqual(self.queries, 2)
+        self.assertEqual(self.cache.stats, {'hits': 1, 'misses': 1, 'probes': 2, 'entries': 1})
+        # Another filter is another entry
+        self.find(limit=1)
+        self.assertEqual(self.queries, 3)
+
+    def test_miss_after_edit(self):
+        self.find()
+        self.rows[1] = page('b', '2021-11-11T10:01:00.000Z')
+        self.find()
+        self.assertEqual(self.queries, 4)
+
+        # Same minute but another page
+        self.rows.append(page('c', '2021-11-11T10:01:00.000Z'))
+        self.rows[1] = page('b', '2021-11-11T09:00:00.000Z')
+        self.now = datetime(2021, 11, 11, 10, 5)
+        self.assertEqual(self.find(), ['a', 'b', 'c'])
+        self.assertEqual(self.queries, 7)
+
+    def test_no_reuse_within_edit_minute(self):
+        # Fetched in the minute of the last edit: later edits of that minute would go unnoticed
+        self.now = datetime(2021, 11, 11, 10, 0, 30)
+        self.find()
+        self.find()
+        self.assertEqual(self.queries, 4)
+
+        self.now = datetime(2021, 11, 11, 10, 1)
+        self.find()
+        self.find()
+        self.assertEqual(self.queries, 6)
+
+    def test_max_age(self):
+        self.cache.max_age = 60
+        with mock.patch('src.notiondb.query_cache.time.monotonic', return_value=1000):
+            self.find()
+        with mock.patch('src.notiondb.query_cache.time.monotonic', return_value=1030):
+            self.find()
+        self.assertEqual(self.queries, 2)
+        with mock.patch('src.notiondb.query_cache.time.monotonic', return_value=1061):
+            self.find()
+        self.assertEqual(self.queries, 4)
+
+    def test_not_stored_when_stopped_early(self):
+        rows = self.database.find(FILTER)
+        next(rows)
+        rows.close()
+        self.assertEqual(self.cache.stats['entries'], 0)
+        self.find()
+        self.assertEqual(self.cache.stats['entries'], 1)
+
+    def test_invalidated_by_writes(self):
+        self.find()
+        self.database.update_one('b', {'Price': {'number': 2}})
+        self.assertEqual(self.cache.stats['entries'], 0)
+        self.find()
+        self.assertEqual(self.cache.stats['misses'], 2)
+
+    def test_uncached_reads(self):
+        self.find()
+        # Incomplete rows and reads from a cursor bypass the cache
+        self.find(complete=False)
+        self.find(start_cursor='1')
+        self.assertEqual(self.cache.stats['probes'], 1)
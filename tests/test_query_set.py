@@ -0,0 +1,117 @@
+import unittest
+from src.notiondb import NotionApi, NotionDatabase, NotionModel, NotionTransientError, QueryCache, RetryPolicy
+from src.notiondb.fields import RelationField, TitleField
+from .stub import make_response, stub_api
+
+
+SCHEMA = {
+    'Name': {'id': 'title', 'name': 'Name', 'type': 'title', 'title': {}},
+    'Related': {'id': 'r', 'name': 'Related', 'type': 'relation', 'relation': {}},
+    'Price': {'id': '%3AUPp', 'name': 'Price', 'type': 'number', 'number': {}},
+}
+RELATED = [{'id': f'related-{i}'} for i in range(30)]
+
+
+def page(id: str, name: str = 'Apple', related: list = None, has_more: bool = False):
+    return {
+        'object': 'page',
+        'id': id,
+        'last_edited_time': '2021-11-11T10:00:00.000Z',
+        'properties': {
+            'Name': {'id': 'title', 'type': 'title', 'title': [{'type': 'text', 'plain_text': name, 'text': {'content': name}}]},
+            'Related': {'id': 'r', 'type': 'relation', 'relation': related or [], 'has_more': has_more},
+        },
+    }
+
+
+class Product(NotionModel):
+
+    name = TitleField('Name')
+    related = RelationField('Related')
+
+
+class TestQuerySet(unittest.TestCase):
+
+    def setUp(self):
+        self.database = NotionDatabase(database_id='database-id', api=NotionApi('token', rate_limit=None, retry=RetryPolicy(max_retries=0)))
+        self.rows = [page('a', related=RELATED[:25], has_more=True)]
+        self.session = stub_api(self.database.api, self.handle)
+
+    def handle(self, method, url, kwargs):
+        path = url.split('/v1/', 1)[-1]
+        if path.endswith('/query'):
+            return make_response(200, {'object': 'list', 'results': self.rows[:kwargs['json'].get('page_size') or 100], 'next_cursor': None})
+        if path.startswith('databases/'):
+            return make_response(200, {'object': 'database', 'id': 'database-id', 'title': [], 'properties': SCHEMA})
+        if path == 'pages/missing':
+            return make_response(404, {'object': 'error', 'status': 404, 'code': 'object_not_found', 'message': 'missing'})
+        if path == 'pages/failing':
+            return make_response(503, {'object': 'error', 'status': 503, 'code': 'service_unavailable', 'message': 'unavailable'})
+        if '/properties/' in path:
+            results = [{'object': 'property_item', 'type': 'relation', 'relation': item} for item in RELATED]
+            return make_response(200, {'object': 'list', 'results': results, 'next_cursor': None})
+        return make_response(200, page(path.rsplit('/', 1)[-1]))
+
+    def paths(self):
+        return [(method, url.split('/v1/', 1)[-1]) for method, url, _ in self.session.calls]
+
+    def test_exists_sends_one_request(self):
+        self.database.query_cache = QueryCache()
+        self.assertTrue(Product.objects(self.database).exists())
+        self.assertTrue(Product.objects(self.database).only('name').exists())
+        self.assertEqual(self.paths(), [('POST', 'databases/database-id/query')] * 2)
+
+        self.rows = []
+        self.assertFalse(Product.objects(self.database).exists())
+
+    def test_first_completes_truncated_values(self):
+        product = Product.objects(self.database).first()
+        self.assertEqual(len(product.related.value), 30)
+        self.assertEqual(self.paths(), [('POST', 'databases/database-id/query'), ('GET', 'pages/a/properties/r')])
+
+        self.session.calls.clear()
+        self.rows = [page('b', related=RELATED[:2])]
+        self.assertEqual(Product.objects(self.database).first().id, 'b')
+        self.assertEqual(self.paths(), [('POST', 'databases/database-id/query')])
+
+    def test_prefetch_related(self):
+        # 6 rows sharing 3 related pages, one of them missing
+        ids = ['related-0', 'related-1', 'missing']
+        self.rows = [page(f'row-{i}', related=[{'id': ids[i % 3]}, {'id': ids[(i + 1) % 3]}]) for i in range(6)]
+
+        products = list(Product.objects(self.database).prefetch_related('related', model=Product).get())
+        fetched = sorted(path for method, path in self.paths() if method == 'GET')
+        self.assertEqual(fetched, ['pages/missing', 'pages/related-0', 'pages/related-1'])
+
+        first = products[0]
+        self.assertEqual(first.related.value, ['related-0', 'related-1'])
+        self.assertEqual([model.id for model in first.related.related], ['related-0', 'related-1'])
+        self.assertIsInstance(first.related.related[0], Product)
+        # Related models are shared across rows
+        self.assertIs(products[3].related.related[0], first.related.related[0])
+        self.assertEqual([model.id for model in products[1].related.related], ['related-1'])
+
+    def test_prefetch_related_failures_raise(self):
+        self.rows = [page('a', related=[{'id': 'related-0'}, {'id': 'failing'}])]
+        with self.assertRaises(NotionTransientError):
+            list(Product.objects(self.database).prefetch_related('related', model=Product).get())
+
+    def test_only_sends_filter_properties(self):
+        self.rows = [page('a')]
+        list(Product.objects(self.database).only('name', 'Price').get())
+        method, url, kwargs = self.session.calls[-1]
+        self.assertTrue(url.endswith('databases/database-id/query'))
+        # Ids resolved from the schema, URL-encoded ones decoded
+        self.assertEqual(kwargs['params'], {'filter_properties': ['title', ':UPp']})
+        self.assertEqual(self.paths()[0], ('GET', 'databases/database-id'))
+
+        self.database.find_one('a', only=['Related', 'Unknown'])
+        method, url, kwargs = self.session.calls[-1]
+        self.assertEqual((method, url.split('/v1/', 1)[-1]), ('GET', 'pages/a'))
+        self.assertEqual(kwargs['params'], {'filter_properties': ['r', 'Unknown']})
+
+        # The schema is fetched once
+        self.assertEqual([path for _, path in self.paths()].count('databases/database-id'), 1)
+
+        list(self.database.find())
+        self.assertEqual(self.session.calls[-1][2]['params'], {})
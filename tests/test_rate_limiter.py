@@ -0,0 +1,78 @@
+import asyncio
+import time
+import unittest
+import httpx
+from src.notiondb import AsyncNotionApi, NotionApi, RetryPolicy
+from src.notiondb.rate_limiter import RateLimiter
+from .stub import make_response, stub_api
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_burst_then_queued(self):
+        limiter = RateLimiter(rate=10, burst=2)
+        self.assertEqual(limiter.reserve(), 0)
+        self.assertEqual(limiter.reserve(), 0)
+        self.assertAlmostEqual(limiter.reserve(), 0.1, delta=0.02)
+        self.assertAlmostEqual(limiter.reserve(), 0.2, delta=0.02)
+        stats = limiter.stats
+        self.assertEqual((stats['requests'], stats['delayed']), (4, 2))
+
+    def test_pause(self):
+        limiter = RateLimiter(rate=10, burst=5)
+        limiter.pause(1)
+        # Every token is held back until the pause ends
+        self.assertAlmostEqual(limiter.reserve(), 1.1, delta=0.05)
+        self.assertAlmostEqual(limiter.reserve(), 1.2, delta=0.05)
+
+    def test_shorter_pause_keeps_longer_one(self):
+        limiter = RateLimiter(rate=10, burst=1)
+        limiter.pause(1)
+        limiter.pause(0.1)
+        self.assertGreater(limiter.reserve(), 1)
+
+
+def rate_limited(count: int, retry_after: str = '0.05'):
+    responses = [make_response(429, headers={'Retry-After': retry_after}) for _ in range(count)]
+    responses.append(make_response(200, {'object': 'page', 'id': 'page-id'}))
+    return lambda *_: responses.pop(0)
+
+
+class TestRateLimitedResponses(unittest.TestCase):
+
+    def test_retry_after_without_limiter(self):
+        api = NotionApi('token', rate_limit=None, retry=RetryPolicy(max_retries=0))
+        session = stub_api(api, rate_limited(3))
+        start = time.monotonic()
+        self.assertEqual(api.get_page('page-id')['id'], 'page-id')
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+        self.assertEqual(len(session.calls), 4)
+
+    def test_retry_after_with_limiter(self):
+        api = NotionApi('token', rate_limit=100, retry=RetryPolicy(max_retries=0))
+        stub_api(api, rate_limited(2))
+        start = time.monotonic()
+        api.get_page('page-id')
+        self.assertGreaterEqual(time.monotonic() - start, 0.1)
+
+    def test_async_retry_after_without_limiter(self):
+        handler = rate_limited(3)
+
+        async def run():
+            api = AsyncNotionApi('token', rate_limit=None, retry=RetryPolicy(max_retries=0))
+            calls = []
+
+            def transport(request):
+                calls.append(request)
+                response = handler()
+                return httpx.Response(response.status_code, headers=dict(response.headers), content=response.content)
+
+            api.session = httpx.AsyncClient(transport=httpx.MockTransport(transport))
+            start = time.monotonic()
+            page = await api.get_page('page-id')
+            return page, time.monotonic() - start, len(calls)
+
+        page, elapsed, calls = asyncio.run(run())
+        self.assertEqual(page['id'], 'page-id')
+        self.assertGreaterEqual(elapsed, 0.15)
+        self.assertEqual(calls, 4)
@@ -0,0 +1,106 @@
+import unittest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+from src.notiondb import NotionApi, NotionApiError, NotionConnectionError, NotionTransientError, RetryPolicy
+from .stub import make_response, stub_api
+
+
+def retrying_api():
+    return NotionApi('token', rate_limit=None, retry=RetryPolicy(max_retries=3, backoff=0))
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_decisions(self):
+        policy = RetryPolicy(max_retries=2)
+        self.assertTrue(policy.is_idempotent('PATCH'))
+        self.assertFalse(policy.is_idempotent('POST'))
+        self.assertTrue(policy.is_idempotent('POST', idempotent=True))
+        self.assertFalse(policy.is_idempotent('PATCH', idempotent=False))
+
+        self.assertTrue(policy.should_retry_status(0, 502, True))
+        self.assertFalse(policy.should_retry_status(0, 502, False))
+        self.assertFalse(policy.should_retry_status(0, 400, True))
+        self.assertFalse(policy.should_retry_status(2, 502, True))
+
+        self.assertTrue(policy.should_retry_error(0, False, sent=False))
+        self.assertFalse(policy.should_retry_error(0, False, sent=True))
+        self.assertFalse(policy.should_retry_error(2, True))
+
+    def test_delay_is_bounded(self):
+        policy = RetryPolicy(backoff=1, max_backoff=5)
+        for attempt in range(10):
+            delay = policy.delay(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(5, 2 ** attempt))
+
+
+class TestRetryingRequests(unittest.TestCase):
+
+    def test_idempotent_write_is_retried(self):
+        api = retrying_api()
+        session = stub_api(api, lambda *_: make_response(502))
+        with self.assertRaises(NotionTransientError):
+            api.update_page('page-id', archived=True)
+        self.assertEqual(len(session.calls), 4)
+
+    def test_append_children_is_not_retried(self):
+        api = retrying_api()
+        session = stub_api(api, lambda *_: make_response(502, {'code': 'bad_gateway'}))
+        with self.assertRaises(NotionTransientError):
+            api.append_block_children('block-id', children=[])
+        self.assertEqual(len(session.calls), 1)
+
+    def test_create_is_retried_only_when_not_sent(self):
+        def refused(*_):
+            raise requests.exceptions.ConnectTimeout('connect timeout')
+
+        api = retrying_api()
+        session = stub_api(api, refused)
+        with self.assertRaises(NotionConnectionError):
+            api.create_page('database_id', 'database-id', properties={})
+        self.assertEqual(len(session.calls), 4)
+
+        def unreachable(*_):
+            # As raised by requests for a refused connection or a DNS failure (NameResolutionError in urllib3 2)
+            reason = NewConnectionError(None, 'Failed to establish a new connection: [Errno 111] Connection refused')
+            raise requests.exceptions.ConnectionError(MaxRetryError(None, '/v1/pages', reason))
+
+        session = stub_api(api, unreachable)
+        with self.assertRaises(NotionConnectionError):
+            api.create_page('database_id', 'database-id', properties={})
+        self.assertEqual(len(session.calls), 4)
+
+        def reset(*_):
+            raise requests.exceptions.ConnectionError(ProtocolError('Connection aborted.', ConnectionResetError()))
+
+        session = stub_api(api, reset)
+        with self.assertRaises(NotionConnectionError):
+            api.create_page('database_id', 'database-id', properties={})
+        self.assertEqual(len(session.calls), 1)
+
+        def dropped(*_):
+            raise requests.exceptions.ReadTimeout('read timeout')
+
+        session = stub_api(api, dropped)
+        with self.assertRaises(NotionConnectionError):
+            api.create_page('database_id', 'database-id', properties={})
+        self.assertEqual(len(session.calls), 1)
+
+    def test_recovers_after_transient_status(self):
+        responses = [make_response(503), make_response(200, {'object': 'page', 'id': 'page-id'})]
+        api = retrying_api()
+        stub_api(api, lambda *_: responses.pop(0))
+        self.assertEqual(api.get_page('page-id')['id'], 'page-id')
+
+
+class TestErrors(unittest.TestCase):
+
+    def test_str(self):
+        self.assertEqual(str(NotionApiError('Not found', status=404, code='object_not_found')), '[404] object_not_found: Not found')
+        self.assertEqual(str(NotionConnectionError('connection reset')), 'connection reset')
+        self.assertEqual(str(NotionApiError(status=500)), '[500] HTTP 500')
+
+    def test_from_response(self):
+        error = NotionApiError.from_response(make_response(404, {'code': 'object_not_found', 'message': 'Missing'}))
+        self.assertEqual((type(error).__name__, error.status, error.code), ('NotionNotFoundError', 404, 'object_not_found'))